@@ -0,0 +1,147 @@
+"""
+alt_ext_binding
+
+Benchmarks the cost of calling a callback registered through `AltExt`, against a method of a
+hand-written `Extension`.
+
+The same component callback is registered three ways against a stub client, then the callable
+the dispatcher would run is awaited in a loop:
+
+* as a method of an `Extension` subclass, the reference,
+* through `AltExt`, which stores it as a `staticmethod`,
+* wrapped in a coroutine that drops `self`, as `AltExt` did before.
+
+For every way, the benchmark reports the mean time per call over batches, and the best batch.
+
+Usage:
+
+```
+python benchmarks/alt_ext_binding.py
+python benchmarks/alt_ext_binding.py --calls 200000 --batches 7
+```
+
+(c) 2022 interactions-py.
+"""
+import argparse
+import asyncio
+from functools import wraps
+from statistics import mean
+from time import perf_counter_ns
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from interactions import Client, Extension
+from interactions import extension_component as ext_comp
+
+from interactions.ext.enhanced import AltExt
+
+
+class StubDispatch:
+    """A dispatcher that only records the registered callbacks."""
+
+    def __init__(self):
+        self.events: Dict[str, List[Callable]] = {}
+
+    def register(self, coro: Callable, name: str):
+        self.events.setdefault(name, []).append(coro)
+
+
+class StubClient(Client):
+    """The smallest client extensions can be loaded into."""
+
+    def __init__(self):  # no connection is ever made, so `Client.__init__` is skipped
+        self._websocket = SimpleNamespace(_dispatch=StubDispatch(), ready=asyncio.Event())
+        self._loop = asyncio.get_event_loop()
+        self._commands = []
+        self._extensions = {}
+        self._automate_sync = False
+
+    def event(self, coro: Callable, name: str):
+        self._websocket._dispatch.register(coro, name)
+        return coro
+
+    def _Client__resolve_commands(self):
+        pass
+
+
+def remove_self(coro: Callable) -> Callable:
+    """How `AltExt` used to bind callbacks."""
+
+    @wraps(coro)
+    async def wrapper(*args, **kwargs):
+        return await coro(*args[1:], **kwargs)
+
+    return wrapper
+
+
+async def callback(ctx):
+    pass
+
+
+class HandWritten(Extension):
+    @ext_comp("hand_written")
+    async def hand_written(self, ctx):
+        pass
+
+
+class SelfRemoved(Extension):
+    self_removed = ext_comp("self_removed")(remove_self(callback))
+
+
+def register(client: StubClient) -> Dict[str, Callable]:
+    HandWritten(client)
+    SelfRemoved(client)
+
+    ext = AltExt("Bench")
+    ext.component("alt_ext")(callback)
+    ext(client)
+
+    events = client._websocket._dispatch.events
+    return {
+        "Extension": events["component_hand_written"][0],
+        "AltExt": events["component_alt_ext"][0],
+        "remove_self": events["component_self_removed"][0],
+    }
+
+
+async def measure(handler: Callable, calls: int, batches: int) -> List[float]:
+    """Returns the nanoseconds per call of every batch."""
+    ctx = object()
+    for _ in range(calls // 10):  # warm up
+        await handler(ctx)
+
+    timings = []
+    for _ in range(batches):
+        start = perf_counter_ns()
+        for _ in range(calls):
+            await handler(ctx)
+        timings.append((perf_counter_ns() - start) / calls)
+    return timings
+
+
+async def run(args: argparse.Namespace) -> None:
+    handlers = register(StubClient())
+    print(f"{'binding':>12} {'mean ns':>9} {'best ns':>9} {'vs Extension':>13}")
+    reference = None
+    for name, handler in handlers.items():
+        timings = await measure(handler, args.calls, args.batches)
+        reference = reference or mean(timings)
+        print(
+            f"{name:>12} {mean(timings):>9.1f} {min(timings):>9.1f} "
+            f"{mean(timings) / reference:>12.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--batches", type=int, default=5)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
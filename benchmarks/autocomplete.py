@@ -0,0 +1,96 @@
+"""
+autocomplete
+
+Benchmarks answering autocomplete queries with `AutocompleteIndex`, against filtering the list of
+choices linearly on every keystroke.
+
+For every collection size, random names are indexed, then every prefix of some names, and some
+misspelled names, are searched. The benchmark reports the build time and the per-query latency
+(mean, p99) of the linear filter and of the index, with and without NumPy.
+
+Usage:
+
+```
+python benchmarks/autocomplete.py
+python benchmarks/autocomplete.py --items 1000 50000 200000 --queries 2000
+```
+
+(c) 2022 interactions-py.
+"""
+import argparse
+import random
+import string
+from statistics import mean
+from time import perf_counter, perf_counter_ns
+from typing import Callable, List
+
+from interactions.ext.enhanced.autocomplete import AutocompleteIndex, numpy
+
+
+def make_names(amount: int, rng: random.Random) -> List[str]:
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(2000)]
+    return [" ".join(rng.choices(words, k=rng.randint(1, 3))).title() for _ in range(amount)]
+
+
+def make_queries(names: List[str], amount: int, rng: random.Random) -> List[str]:
+    """Every prefix of some names, as typed, and some names with a typo."""
+    queries = []
+    while len(queries) < amount:
+        name = rng.choice(names)
+        if rng.random() < 0.2 and len(name) > 3:
+            i = rng.randrange(len(name))
+            queries.append(name[:i] + name[i + 1 :])
+        else:
+            queries.extend(name[:i] for i in range(1, len(name) + 1))
+    return queries[:amount]
+
+
+def linear(names: List[str]) -> Callable[[str], list]:
+    def search(query: str) -> list:
+        query = query.casefold()
+        return [name for name in names if query in name.casefold()][:25]
+
+    return search
+
+
+def measure(search: Callable[[str], list], queries: List[str]) -> dict:
+    timings = []
+    for query in queries:
+        start = perf_counter_ns()
+        search(query)
+        timings.append(perf_counter_ns() - start)
+    timings.sort()
+    return {"mean_us": mean(timings) / 1000, "p99_us": timings[int(len(timings) * 0.99)] / 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'items':>7} {'engine':>8} {'build ms':>9} {'mean us':>9} {'p99 us':>9}")
+    for amount in args.items:
+        rng = random.Random(args.seed)
+        names = make_names(amount, rng)
+        queries = make_queries(names, args.queries, rng)
+
+        engines = [("linear", 0.0, linear(names))]
+        for use_numpy in (False, True) if numpy is not None else (False,):
+            start = perf_counter()
+            index = AutocompleteIndex(names, use_numpy=use_numpy)
+            engines.append(
+                ("numpy" if use_numpy else "index", perf_counter() - start, index.search)
+            )
+
+        for engine, build, search in engines:
+            r = measure(search, queries)
+            print(
+                f"{amount:>7} {engine:>8} {build * 1000:>9.1f} {r['mean_us']:>9.1f} "
+                f"{r['p99_us']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+callback_routing
+
+Benchmarks how `Enhanced.__callback` routes component and modal interactions as the number of
+registered callbacks grows.
+
+Callbacks are registered with `callbacks.component` and `callbacks.modal` against a stub client
+and dispatcher, then synthetic `custom_id`s are routed through the `on_component` and `on_modal`
+hooks. For every route count the benchmark reports:
+
+* the per-event routing latency (mean, p50, p99),
+* the peak memory allocated while routing one event,
+* the memory retained per registered route.
+
+Exact `custom_id`s are dispatched by interactions.py itself, so only `startswith` and `regex`
+matches count as matched here, but every event still pays for the routing scan.
+
+Usage:
+
+```
+python benchmarks/callback_routing.py
+python benchmarks/callback_routing.py --routes 10 1000 50000 --mix 70:20:10 --events 5000
+python benchmarks/callback_routing.py --distribution uniform --miss-rate 0.2 --json
+```
+
+(c) 2022 interactions-py.
+"""
+import argparse
+import asyncio
+import json
+import random
+import tracemalloc
+from bisect import bisect
+from itertools import accumulate
+from statistics import mean
+from time import perf_counter_ns
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+from interactions import Client, CommandContext, ComponentContext
+
+from interactions.ext.enhanced import Enhanced, callbacks
+
+
+class StubDispatch:
+    """A dispatcher that records dispatches instead of scheduling tasks."""
+
+    def __init__(self):
+        self.events: Dict[str, List[Callable]] = {}
+        self.dispatched: int = 0
+
+    def register(self, coro: Callable, name: str):
+        self.events.setdefault(name, []).append(coro)
+
+    def dispatch(self, name: str, *args, **kwargs):
+        self.dispatched += 1
+
+
+class StubClient(Client):
+    """The smallest client `Enhanced` and the callback decorators can be used with."""
+
+    def __init__(self):  # no connection is ever made, so `Client.__init__` is skipped
+        self._websocket = SimpleNamespace(_dispatch=StubDispatch(), ready=asyncio.Event())
+        self._loop = asyncio.get_event_loop()
+        self._commands = []
+        self._extensions = {}
+        self._automate_sync = False
+
+    def event(self, coro: Callable, name: str):
+        self._websocket._dispatch.register(coro, name)
+        return coro
+
+    def _Client__resolve_commands(self):
+        pass
+
+
+def make_handler() -> Callable:
+    async def handler(ctx):
+        pass
+
+    return handler
+
+
+def make_context(kind: str, custom_id: str):
+    """Creates a bare context holding only the data routing looks at."""
+    cls = ComponentContext if kind == "component" else CommandContext
+    ctx = cls.__new__(cls)
+    ctx.data = SimpleNamespace(custom_id=custom_id)
+    return ctx
+
+
+def register_routes(
+    client: StubClient, amount: int, mix: Tuple[int, int, int], rng: random.Random
+) -> List[Tuple[str, str, str]]:
+    """
+    Registers `amount` callbacks split between exact, startswith and regex routes.
+
+    Returns the `(kind, route type, route)` of every registered callback.
+    """
+    weights = list(accumulate(mix))
+    routes = []
+    for i in range(amount):
+        kind = "component" if rng.random() < 0.8 else "modal"
+        route_type = ("exact", "startswith", "regex")[bisect(weights, rng.random() * weights[-1])]
+        decorator = callbacks.component if kind == "component" else callbacks.modal
+
+        if route_type == "exact":
+            route = f"{kind[0]}{i}_exact"
+            decorator(client, route)(make_handler())
+        elif route_type == "startswith":
+            route = f"{kind[0]}{i}_sw:"
+            decorator(client, route, startswith=True)(make_handler())
+        else:
+            route = rf"{kind[0]}{i}_re:[0-9]+"
+            decorator(client, route, regex=True)(make_handler())
+        routes.append((kind, route_type, route))
+    return routes
+
+
+def custom_id_for(route_type: str, route: str, rng: random.Random) -> str:
+    """Builds a `custom_id` that the route matches, as a real component would carry."""
+    if route_type == "exact":
+        return route
+    if route_type == "startswith":
+        return f"{route}{rng.randrange(10 ** 6)}"
+    return f"{route.split(':', 1)[0]}:{rng.randrange(10 ** 6)}"
+
+
+def synthetic_events(
+    routes: List[Tuple[str, str, str]],
+    amount: int,
+    distribution: str,
+    miss_rate: float,
+    rng: random.Random,
+) -> List[Tuple[str, str]]:
+    """
+    Draws `(kind, custom_id)` events.
+
+    `zipf` makes a few routes hot, like the main panel of a bot, while `uniform` spreads events
+    evenly. `miss_rate` is the fraction of events that do not match any route.
+    """
+    if distribution == "zipf":
+        weights = list(accumulate(1 / rank for rank in range(1, len(routes) + 1)))
+        pick = lambda: routes[bisect(weights, rng.random() * weights[-1])]  # noqa: E731
+    else:
+        pick = lambda: routes[rng.randrange(len(routes))]  # noqa: E731
+
+    events = []
+    for _ in range(amount):
+        if rng.random() < miss_rate:
+            events.append(("component", f"unrouted_{rng.randrange(10 ** 6)}"))
+            continue
+        kind, route_type, route = pick()
+        events.append((kind, custom_id_for(route_type, route, rng)))
+    return events
+
+
+async def route_events(enhanced: Enhanced, contexts: list) -> List[int]:
+    on_component, on_modal = enhanced._on_component, enhanced._on_modal
+    timings = []
+    for ctx in contexts:
+        handler = on_component if isinstance(ctx, ComponentContext) else on_modal
+        start = perf_counter_ns()
+        await handler(ctx)
+        timings.append(perf_counter_ns() - start)
+    return timings
+
+
+async def peak_per_event(enhanced: Enhanced, contexts: list) -> float:
+    on_component, on_modal = enhanced._on_component, enhanced._on_modal
+    peaks = []
+    for ctx in contexts:
+        handler = on_component if isinstance(ctx, ComponentContext) else on_modal
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        await handler(ctx)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    return mean(peaks)
+
+
+async def run(amount: int, args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    client = StubClient()
+    enhanced = Enhanced(client)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    routes = register_routes(client, amount, args.mix, rng)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    events = synthetic_events(routes, args.events, args.distribution, args.miss_rate, rng)
+    contexts = [make_context(kind, custom_id) for kind, custom_id in events]
+
+    await route_events(enhanced, contexts[: min(len(contexts), 200)])  # warm up
+    client._websocket._dispatch.dispatched = 0
+    timings = sorted(await route_events(enhanced, contexts))
+    matched = client._websocket._dispatch.dispatched
+
+    tracemalloc.start()
+    peak = await peak_per_event(enhanced, contexts[: args.alloc_events])
+    tracemalloc.stop()
+
+    return {
+        "routes": amount,
+        "events": len(contexts),
+        "matched": matched,
+        "mean_us": mean(timings) / 1000,
+        "p50_us": timings[len(timings) // 2] / 1000,
+        "p99_us": timings[int(len(timings) * 0.99) - 1] / 1000,
+        "peak_bytes_per_event": peak,
+        "bytes_per_route": retained / amount,
+    }
+
+
+def parse_mix(value: str) -> Tuple[int, int, int]:
+    parts = tuple(int(part) for part in value.split(":"))
+    if len(parts) != 3 or not any(parts):
+        raise argparse.ArgumentTypeError("mix must look like exact:startswith:regex, e.g. 60:30:10")
+    return parts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--routes", type=int, nargs="+", default=[10, 100, 1000, 10000, 50000])
+    parser.add_argument(
+        "--mix", type=parse_mix, default=(60, 30, 10), help="exact:startswith:regex"
+    )
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--alloc-events", type=int, default=200)
+    parser.add_argument("--distribution", choices=("zipf", "uniform"), default="zipf")
+    parser.add_argument("--miss-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    results = [loop.run_until_complete(run(amount, args)) for amount in args.routes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    header = ("routes", "matched", "mean us", "p50 us", "p99 us", "peak B/event", "B/route")
+    print("{:>8} {:>9} {:>10} {:>10} {:>10} {:>13} {:>9}".format(*header))
+    for r in results:
+        print(
+            f"{r['routes']:>8} {r['matched']:>4}/{r['events']:<4} {r['mean_us']:>10.2f} "
+            f"{r['p50_us']:>10.2f} {r['p99_us']:>10.2f} {r['peak_bytes_per_event']:>13.0f} "
+            f"{r['bytes_per_route']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+import_time
+
+Benchmarks how long importing the package takes, with `python -X importtime`.
+
+Every statement is run in a fresh interpreter, several times. From the `-X importtime` report
+of each run, the self time of every imported module is summed into:
+
+* `enhanced`: the modules of this package,
+* `interactions`: interactions.py itself, which every statement pays for,
+* `other`: everything else, such as `colorama`, `numpy` or the standard library.
+
+The benchmark reports the median of each, and which optional dependencies were imported.
+
+Usage:
+
+```
+python benchmarks/import_time.py
+python benchmarks/import_time.py --repeat 15 --statement "from interactions.ext.enhanced import Enhanced"
+```
+
+(c) 2022 interactions-py.
+"""
+import argparse
+import subprocess
+import sys
+from statistics import median
+from typing import Dict, List, Set, Tuple
+
+STATEMENTS = [
+    "import interactions",
+    "import interactions.ext.enhanced",
+    "from interactions.ext.enhanced import cooldown",
+    "from interactions.ext.enhanced import Enhanced",
+    "from interactions.ext.enhanced import *",
+]
+WATCHED = ("colorama", "numpy", "tracemalloc")
+
+
+def import_times(statement: str) -> Tuple[Dict[str, int], Set[str]]:
+    """Runs a statement in a fresh interpreter, returning the self microseconds per group."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    groups = {"enhanced": 0, "interactions": 0, "other": 0}
+    watched = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if not self_us.isdigit():  # the header
+            continue
+        if name.startswith("interactions.ext.enhanced"):
+            groups["enhanced"] += int(self_us)
+        elif name.split(".")[0] == "interactions":
+            groups["interactions"] += int(self_us)
+        else:
+            groups["other"] += int(self_us)
+        if name.split(".")[0] in WATCHED:
+            watched.add(name.split(".")[0])
+    return groups, watched
+
+
+def run(statement: str, repeat: int) -> dict:
+    runs: List[Dict[str, int]] = []
+    watched: Set[str] = set()
+    for _ in range(repeat):
+        groups, imported = import_times(statement)
+        runs.append(groups)
+        watched |= imported
+    result = {name: median(groups[name] for groups in runs) / 1000 for name in runs[0]}
+    result["total"] = median(sum(groups.values()) for groups in runs) / 1000
+    result["watched"] = sorted(watched)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--statement", nargs="+", default=STATEMENTS)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    print("median milliseconds of self import time")
+    print(f"{'enhanced':>9} {'interactions':>13} {'other':>8} {'total':>8}  statement / imported")
+    for statement in args.statement:
+        r = run(statement, args.repeat)
+        print(
+            f"{r['enhanced']:>9.2f} {r['interactions']:>13.2f} {r['other']:>8.2f} "
+            f"{r['total']:>8.2f}  {statement}"
+        )
+        if r["watched"]:
+            print(f"{'':>42}  imports {', '.join(r['watched'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+logging_overhead
+
+Measures what the library's debug logging costs on the component helpers.
+
+Three things are compared:
+
+* the bare cost of one debug call shaped like the one in `Button`: an eagerly formatted
+  f-string, the lazy `%`-style call the library uses, and the no-op used by `STRIP_DEBUG`,
+* building a small panel with the helpers in `components.py`, with the root logger at `WARNING`,
+  at `DEBUG`, and with `ENHANCED_STRIP_DEBUG=1`.
+
+Every mode of the second part runs in its own interpreter, since `ENHANCED_STRIP_DEBUG` is read
+when the library is imported.
+
+Usage:
+
+```
+python benchmarks/logging_overhead.py
+python benchmarks/logging_overhead.py --number 20000
+```
+
+(c) 2022 interactions-py.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from timeit import timeit
+
+PANEL = """
+from interactions.ext.enhanced import ActionRow, Button, Modal, SelectMenu, TextInput
+from interactions.ext.enhanced.components import SelectOption
+
+def panel():
+    ActionRow(
+        Button(1, "Yes", custom_id="yes"),
+        Button(4, "No", custom_id="no"),
+        Button(5, "Docs", url="https://example.com"),
+    )
+    ActionRow(SelectMenu("sort", [SelectOption("New", "new"), SelectOption("Top", "top")]))
+    Modal("modal", "Modal", [TextInput("name", "Name"), TextInput("age", "Age")])
+"""
+
+
+def call_overhead(number: int) -> dict:
+    """Times a single debug call in each style, with debug logging disabled."""
+    from interactions.ext.enhanced._logging import _stripped, get_logger
+
+    log = get_logger("benchmark")
+    style, label, custom_id, url, emoji, disabled = 1, "Yes", "yes", None, None, False
+
+    def eager():
+        log.debug(
+            f"Creating Button with {style=}, {label=}, {custom_id=}, {url=}, {emoji=}, {disabled=}"
+        )
+
+    def lazy():
+        log.debug(
+            "Creating Button with style=%r, label=%r, custom_id=%r, url=%r, emoji=%r, disabled=%r",
+            style,
+            label,
+            custom_id,
+            url,
+            emoji,
+            disabled,
+        )
+
+    def stripped():
+        _stripped(
+            "Creating Button with style=%r, label=%r, custom_id=%r, url=%r, emoji=%r, disabled=%r",
+            style,
+            label,
+            custom_id,
+            url,
+            emoji,
+            disabled,
+        )
+
+    return {
+        name: timeit(func, number=number) / number * 1e9
+        for name, func in (("eager f-string", eager), ("lazy", lazy), ("stripped", stripped))
+    }
+
+
+def panel_cost(number: int, root_level: str, strip: bool) -> float:
+    """Times building the panel in a fresh interpreter, in nanoseconds per panel."""
+    code = (
+        "import logging, sys\n"
+        f"logging.basicConfig(level=logging.{root_level}, stream=open('{os.devnull}', 'w'))\n"
+        f"{PANEL}\n"
+        "from timeit import timeit\n"
+        f"print(timeit(panel, number={number}) / {number} * 1e9)\n"
+    )
+    env = dict(os.environ, ENHANCED_STRIP_DEBUG="1" if strip else "0")
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    calls = call_overhead(args.number * 20)
+    panels = {
+        "root WARNING": panel_cost(args.number, "WARNING", False),
+        "root DEBUG": panel_cost(args.number, "DEBUG", False),
+        "root DEBUG, ENHANCED_STRIP_DEBUG=1": panel_cost(args.number, "DEBUG", True),
+    }
+
+    if args.json:
+        print(json.dumps({"debug_call_ns": calls, "panel_ns": panels}, indent=2))
+        return
+
+    print("One disabled debug call:")
+    for name, ns in calls.items():
+        print(f"  {name:<36} {ns:>10.0f} ns")
+    print("Building a panel (7 helpers):")
+    for name, ns in panels.items():
+        print(f"  {name:<36} {ns / 1000:>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
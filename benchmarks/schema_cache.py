@@ -0,0 +1,147 @@
+"""
+schema_cache
+
+Benchmarks how long `setup_options` takes to set up the options of many commands, with and
+without the schema cache, and lazily.
+
+Commands are generated into a synthetic module, each with a mix of `EnhancedOption` and
+`Annotated` options, and defined three times, timing both `setup_options` and the whole module,
+which also evaluates the annotations:
+
+* without the cache, as every start did before,
+* with an empty cache, the first start after enabling it or changing every command,
+* with a warm cache loaded from its file, every later start,
+* lazily, without the cache, where the options are only built by `materialize_options`, which
+  is timed on its own.
+
+Usage:
+
+```
+python benchmarks/schema_cache.py
+python benchmarks/schema_cache.py --commands 50 300 1000 --options 5 --repeat 5
+```
+
+(c) 2022 interactions-py.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+from types import ModuleType
+from typing import Tuple
+
+from interactions.ext.enhanced import materialize_options, schema_cache, setup_options
+
+MODULE = "enhanced_schema_benchmark"
+
+HEADER = """\
+from typing_extensions import Annotated
+from interactions import Channel, Choice, OptionType, Role, User
+from interactions.ext.enhanced import EnhancedOption
+"""
+
+OPTIONS = [
+    'o{i}: EnhancedOption(str, "A string", min_length=1, max_length=100)',
+    'o{i}: EnhancedOption(int, "An integer", choices=[Choice(name="one", value=1)])',
+    'o{i}: Annotated[User, EnhancedOption(description="A user")]',
+    'o{i}: Annotated[Channel, EnhancedOption(description="A channel")]',
+    'o{i}: EnhancedOption(OptionType.NUMBER, "A number", min_value=0, max_value=1)',
+    'o{i}: Annotated[Role, EnhancedOption(description="A role")]',
+]
+
+
+def source(commands: int, options: int) -> str:
+    """Generates the source of a module defining `commands` commands."""
+    lines = [HEADER]
+    for c in range(commands):
+        params = ", ".join(OPTIONS[(c + i) % len(OPTIONS)].format(i=i) for i in range(options))
+        lines.append(f"@setup_options\nasync def command_{c}(ctx, {params}):\n    pass\n")
+    return "\n".join(lines)
+
+
+def define(code, lazy: bool = False) -> Tuple[float, float]:
+    """
+    Executes the module, returning how long defining its commands took, in total and in
+    `setup_options`.
+    """
+    spent = 0.0
+
+    def timed_setup_options(coro):
+        nonlocal spent
+        start = perf_counter()
+        coro = setup_options(coro, lazy=lazy)
+        spent += perf_counter() - start
+        return coro
+
+    module = ModuleType(MODULE)
+    module.setup_options = timed_setup_options
+    sys.modules[MODULE] = module
+    start = perf_counter()
+    exec(code, module.__dict__)
+    return perf_counter() - start, spent
+
+
+def run(commands: int, options: int, repeat: int) -> dict:
+    code = compile(source(commands, options), f"<{MODULE}>", "exec")
+    define(code)  # warm up imports
+
+    path = os.path.join(tempfile.mkdtemp(), "schema.json")
+    uncached, cold, warm, lazy, materialize = [], [], [], [], []
+    for _ in range(repeat):
+        uncached.append(define(code))
+
+        if os.path.exists(path):
+            os.remove(path)
+        schema_cache.enable_schema_cache(path)
+        cold.append(define(code))
+        schema_cache.disable_schema_cache()
+
+        cache = schema_cache.enable_schema_cache(path)
+        warm.append(define(code))
+        assert cache.hits == commands, (cache.hits, cache.misses)
+        schema_cache.disable_schema_cache()
+
+        lazy.append(define(code, lazy=True))
+        start = perf_counter()
+        assert len(materialize_options()) == commands
+        materialize.append(perf_counter() - start)
+
+    result = {
+        "commands": commands,
+        "file_kb": os.path.getsize(path) / 1024,
+        "materialize_ms": median(materialize) * 1000,
+    }
+    for name, timings in (("uncached", uncached), ("cold", cold), ("warm", warm), ("lazy", lazy)):
+        result[f"{name}_total_ms"] = median(total for total, _ in timings) * 1000
+        result[f"{name}_setup_ms"] = median(setup for _, setup in timings) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--commands", type=int, nargs="+", default=[50, 300, 1000])
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("milliseconds spent in setup_options / defining the whole module")
+    print(
+        f"{'commands':>8} {'uncached':>17} {'cold cache':>17} {'warm cache':>17} {'lazy':>17} "
+        f"{'materialize':>11} {'file KiB':>9}"
+    )
+    for amount in args.commands:
+        r = run(amount, args.options, args.repeat)
+        columns = (
+            f"{r[f'{name}_setup_ms']:>8.2f} /{r[f'{name}_total_ms']:>7.2f}"
+            for name in ("uncached", "cold", "warm", "lazy")
+        )
+        print(
+            f"{r['commands']:>8} {' '.join(columns)} {r['materialize_ms']:>11.2f} "
+            f"{r['file_kb']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,25 @@ enhanced
 Enhanced interactions for interactions.py.
 
 Everything within and including the below modules
-is importable directly from enhanced.
+is importable directly from enhanced, and is only
+imported when it is first used.
 
 Modules:
 
+* autocomplete: indexed autocomplete.
+* caches: command response caches and single flights.
 * callbacks: component or modal callbacks.
 * commands: slash commands.
 * command_models: slash command option models.
 * components: components.
 * cooldowns: command cooldowns.
+* deferrals: automatic deferrals.
+* executors: offloading to executors.
+* profiler: registration profiler.
+* schema_cache: cache of command option schemas.
+* sync: command sync fingerprints.
 * extension: extension.
+* limiters: outbound send limiter.
 * subcommands: subcommands.
 
 GitHub: https://github.com/interactions-py/enhanced/
@@ -22,24 +31,194 @@ PyPI: https://pypi.org/project/enhanced/
 
 (c) 2022 interactions-py.
 """
-from . import (
-    _logging,
-    alt_ext,
-    callbacks,
-    command_models,
-    commands,
-    components,
-    cooldowns,
-    extension,
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
+# the submodules are imported on first access (PEP 562), these imports are for type checkers
+if TYPE_CHECKING:
+    from . import (
+        _logging,
+        alt_ext,
+        autocomplete,
+        caches,
+        callbacks,
+        command_models,
+        commands,
+        components,
+        cooldowns,
+        deferrals,
+        executors,
+        extension,
+        limiters,
+        profiler,
+        schema_cache,
+        sync,
+    )
+    from ._logging import (
+        CustomFormatter,
+        Data,
+        DroppingQueueHandler,
+        JSONFormatter,
+        SamplingFilter,
+        get_logger,
+        sample_logger,
+        set_log_level,
+        start_queue_logging,
+        stop_queue_logging,
+        use_json_logging,
+    )
+    from .alt_ext import AltExt, LazyAltExt
+    from .autocomplete import AutocompleteHandler, AutocompleteIndex, autocomplete_handler
+    from .caches import CacheInfo, cached, single_flight
+    from .callbacks import ModalFields, component, extension_component, extension_modal, modal
+    from .command_models import EnhancedOption
+    from .commands import compile_converter, materialize_options, setup_options
+    from .components import (
+        ActionRow,
+        Button,
+        ComponentDiff,
+        ComponentTemplate,
+        Modal,
+        SelectMenu,
+        TextInput,
+        component_hash,
+        diff_components,
+        edit_components,
+        freeze,
+    )
+    from .cooldowns import cooldown
+    from .deferrals import auto_defer
+    from .executors import offload, shutdown_executors, warm_executor
+    from .extension import Enhanced, base, setup, version
+    from .limiters import (
+        LimiterStats,
+        SendLimiter,
+        active_send_limiter,
+        disable_send_limiter,
+        enable_send_limiter,
+    )
+    from .profiler import (
+        ProfiledStep,
+        RegistrationProfiler,
+        disable_profiler,
+        enable_profiler,
+        profiled,
+    )
+    from .schema_cache import SchemaCache, disable_schema_cache, enable_schema_cache
+    from .sync import (
+        SyncPlan,
+        SyncState,
+        canonicalize,
+        fingerprint_command,
+        fingerprint_options,
+        sync_changed,
+    )
+
+_SUBMODULES = frozenset(
+    {
+        "_logging",
+        "alt_ext",
+        "autocomplete",
+        "caches",
+        "callbacks",
+        "command_models",
+        "commands",
+        "components",
+        "cooldowns",
+        "deferrals",
+        "executors",
+        "extension",
+        "limiters",
+        "profiler",
+        "schema_cache",
+        "sync",
+    }
 )
-from ._logging import CustomFormatter, Data, get_logger
-from .alt_ext import AltExt
-from .callbacks import component, extension_component, extension_modal, modal
-from .command_models import EnhancedOption
-from .commands import setup_options
-from .components import ActionRow, Button, Modal, SelectMenu, TextInput
-from .cooldowns import cooldown
-from .extension import Enhanced, base, setup, version
+_ATTRIBUTES: Dict[str, str] = {
+    "CustomFormatter": "_logging",
+    "Data": "_logging",
+    "DroppingQueueHandler": "_logging",
+    "JSONFormatter": "_logging",
+    "SamplingFilter": "_logging",
+    "get_logger": "_logging",
+    "sample_logger": "_logging",
+    "set_log_level": "_logging",
+    "start_queue_logging": "_logging",
+    "stop_queue_logging": "_logging",
+    "use_json_logging": "_logging",
+    "AltExt": "alt_ext",
+    "LazyAltExt": "alt_ext",
+    "AutocompleteHandler": "autocomplete",
+    "AutocompleteIndex": "autocomplete",
+    "autocomplete_handler": "autocomplete",
+    "CacheInfo": "caches",
+    "cached": "caches",
+    "single_flight": "caches",
+    "ModalFields": "callbacks",
+    "component": "callbacks",
+    "extension_component": "callbacks",
+    "extension_modal": "callbacks",
+    "modal": "callbacks",
+    "EnhancedOption": "command_models",
+    "compile_converter": "commands",
+    "materialize_options": "commands",
+    "setup_options": "commands",
+    "ActionRow": "components",
+    "Button": "components",
+    "ComponentDiff": "components",
+    "ComponentTemplate": "components",
+    "Modal": "components",
+    "SelectMenu": "components",
+    "TextInput": "components",
+    "component_hash": "components",
+    "diff_components": "components",
+    "edit_components": "components",
+    "freeze": "components",
+    "cooldown": "cooldowns",
+    "auto_defer": "deferrals",
+    "offload": "executors",
+    "shutdown_executors": "executors",
+    "warm_executor": "executors",
+    "Enhanced": "extension",
+    "base": "extension",
+    "setup": "extension",
+    "version": "extension",
+    "LimiterStats": "limiters",
+    "SendLimiter": "limiters",
+    "active_send_limiter": "limiters",
+    "disable_send_limiter": "limiters",
+    "enable_send_limiter": "limiters",
+    "ProfiledStep": "profiler",
+    "RegistrationProfiler": "profiler",
+    "disable_profiler": "profiler",
+    "enable_profiler": "profiler",
+    "profiled": "profiler",
+    "SchemaCache": "schema_cache",
+    "disable_schema_cache": "schema_cache",
+    "enable_schema_cache": "schema_cache",
+    "SyncPlan": "sync",
+    "SyncState": "sync",
+    "canonicalize": "sync",
+    "fingerprint_command": "sync",
+    "fingerprint_options": "sync",
+    "sync_changed": "sync",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Imports a submodule, or the submodule defining an attribute, on first access."""
+    if name in _SUBMODULES:
+        return import_module(f".{name}", __name__)
+    if name not in _ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_ATTRIBUTES[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
 
 # fmt: off
 __all__ = [
@@ -47,25 +226,64 @@ __all__ = [
         "Data",  # noqa E131
         "CustomFormatter",
         "get_logger",
+        "DroppingQueueHandler",
+        "start_queue_logging",
+        "stop_queue_logging",
+        "JSONFormatter",
+        "SamplingFilter",
+        "sample_logger",
+        "set_log_level",
+        "use_json_logging",
     "alt_ext",
         "AltExt",
+        "LazyAltExt",
     # "cmd",
         "command_models",
             "EnhancedOption",  # noqa E131
         "commands",
             "setup_options",
+            "compile_converter",
+            "materialize_options",
+        "autocomplete",
+            "AutocompleteIndex",
+            "AutocompleteHandler",
+            "autocomplete_handler",
+        "schema_cache",
+            "SchemaCache",
+            "enable_schema_cache",
+            "disable_schema_cache",
+        "profiler",
+            "RegistrationProfiler",
+            "ProfiledStep",
+            "profiled",
+            "enable_profiler",
+            "disable_profiler",
+        "sync",
+            "canonicalize",
+            "fingerprint_command",
+            "fingerprint_options",
+            "SyncPlan",
+            "SyncState",
+            "sync_changed",
     # "cmpt",
         "callbacks",
             "component",
             "modal",
             "extension_component",
             "extension_modal",
+            "ModalFields",
         "components",
             "ActionRow",
             "Button",
             "SelectMenu",
             "TextInput",
             "Modal",
+            "freeze",
+            "ComponentTemplate",
+            "component_hash",
+            "diff_components",
+            "ComponentDiff",
+            "edit_components",
     "extension",
         "Enhanced",
         "setup",
@@ -73,5 +291,21 @@ __all__ = [
         "version",
     "cooldowns",
         "cooldown",
+    "caches",
+        "cached",
+        "CacheInfo",
+        "single_flight",
+    "deferrals",
+        "auto_defer",
+    "executors",
+        "offload",
+        "warm_executor",
+        "shutdown_executors",
+    "limiters",
+        "SendLimiter",
+        "LimiterStats",
+        "enable_send_limiter",
+        "disable_send_limiter",
+        "active_send_limiter",
 ]
 # fmt: on
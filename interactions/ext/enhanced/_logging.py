@@ -5,61 +5,429 @@ Content:
 
 * Data: constants
 * CustomFormatter: custom formatter for logging
+* JSONFormatter: structured, one JSON object per line formatter for logging
+* SamplingFilter: 1-in-N and token bucket sampling per message template
+* DroppingQueueHandler: non-blocking queue handler that drops records when full
 * get_logger: gets a logger for the library
+* sample_logger: samples the records of a logger
+* set_log_level: changes the level of the library's loggers
+* use_json_logging: switches the library's loggers between coloured and JSON output
+* start_queue_logging: moves the library's logging to a background thread
+* stop_queue_logging: moves the library's logging back to the calling thread
 
 GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/_logging.py
 
 (c) 2022 interactions-py.
 """
+import json
 import logging
-from typing import ClassVar, List, Optional, Union
-
-from colorama import Fore, Style, init
+from logging.handlers import QueueHandler, QueueListener
+from os import environ
+from queue import Full, Queue
+from time import monotonic
+from typing import Any, ClassVar, Dict, List, Optional, Union
 
 
 class Data:
-    """A class representing constants for the library."""
+    """
+    A class representing constants for the library.
+
+    `STRIP_DEBUG` is read from the `ENHANCED_STRIP_DEBUG` environment variable. When it is set,
+    `get_logger` replaces `debug` with a no-op on every library logger as the modules are
+    imported, so debug calls cost nothing even if the root logger is at `DEBUG`.
+
+    `LOGGER_LEVEL` is the level given to `set_log_level`, which loggers created later get too.
+
+    `JSON_LOGS` is read from the `ENHANCED_JSON_LOGS` environment variable, and makes the library
+    format its records with `JSONFormatter`. It can be changed later with `use_json_logging`.
+    """
 
     LOG_LEVEL: ClassVar[int] = logging.ERROR
+    LOGGER_LEVEL: ClassVar[Optional[int]] = None
     LOGGERS: List[str] = []
+    QUEUE_HANDLER: ClassVar[Optional["DroppingQueueHandler"]] = None
+    QUEUE_LISTENER: ClassVar[Optional[QueueListener]] = None
+    STRIP_DEBUG: ClassVar[bool] = environ.get("ENHANCED_STRIP_DEBUG", "").lower() in {"1", "true"}
+    JSON_LOGS: ClassVar[bool] = environ.get("ENHANCED_JSON_LOGS", "").lower() in {"1", "true"}
+
+
+_colorama_initialized: bool = False
+
+
+def _stripped(*args, **kwargs) -> None:
+    """Replaces `Logger.debug` when `Data.STRIP_DEBUG` is set."""
 
 
 class CustomFormatter(logging.Formatter):
-    """A class that allows for customized logged outputs from the library."""
+    """
+    A class that allows for customized logged outputs from the library.
+
+    `colorama` is only imported, and initialized once, when the first record is formatted.
+    """
 
     format_str: str = "%(levelname)s:%(name)s:(ln.%(lineno)d):%(message)s"
-    formats: dict = {
-        logging.DEBUG: Fore.CYAN + format_str + Fore.RESET,
-        logging.INFO: Fore.GREEN + format_str + Fore.RESET,
-        logging.WARNING: Fore.YELLOW + format_str + Fore.RESET,
-        logging.ERROR: Fore.RED + format_str + Fore.RESET,
-        logging.CRITICAL: Style.BRIGHT + Fore.RED + format_str + Fore.RESET + Style.NORMAL,
-    }
+    formats: ClassVar[Optional[Dict[int, str]]] = None
 
     def __init__(self):
         super().__init__()
-        init(autoreset=True)
+        self._formatters: Optional[Dict[int, logging.Formatter]] = None
+        self._fallback: logging.Formatter = logging.Formatter()
+
+    @classmethod
+    def _colored_formats(cls) -> Dict[int, str]:
+        if cls.formats is not None:
+            return cls.formats
+
+        global _colorama_initialized
+        from colorama import Fore, Style, init
+
+        if not _colorama_initialized:
+            init(autoreset=True)
+            _colorama_initialized = True
+        cls.formats = {
+            logging.DEBUG: Fore.CYAN + cls.format_str + Fore.RESET,
+            logging.INFO: Fore.GREEN + cls.format_str + Fore.RESET,
+            logging.WARNING: Fore.YELLOW + cls.format_str + Fore.RESET,
+            logging.ERROR: Fore.RED + cls.format_str + Fore.RESET,
+            logging.CRITICAL: Style.BRIGHT + Fore.RED + cls.format_str + Fore.RESET + Style.NORMAL,
+        }
+        return cls.formats
+
+    def format(self, record):
+        if self._formatters is None:
+            self._formatters = {
+                level: logging.Formatter(log_format)
+                for level, log_format in self._colored_formats().items()
+            }
+        return self._formatters.get(record.levelno, self._fallback).format(record)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    A formatter that writes every record as one JSON object per line.
+
+    Besides the time, level, logger, line and message, the object has the unformatted message
+    `template`, and `suppressed` when a `SamplingFilter` dropped records of the same template
+    since the last one that was written.
+    """
 
     def format(self, record):
-        log_format = self.formats.get(record.levelno)
-        formatter = logging.Formatter(log_format)
-        return formatter.format(record)
+        payload: Dict[str, Any] = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "template": str(record.msg),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=repr, separators=(",", ":"))
+
+
+class SamplingFilter(logging.Filter):
+    """
+    A filter that keeps a fixed share of the records of each message template.
+
+    A template is the unformatted message of a record, so every record of
+    `log.info("%s matched", func)` is counted together, whatever `func` is. A record is kept if
+    it is the first of every `every` records of its template, and, if `rate` is set, its
+    template's token bucket has a token left. Dropped records are counted in `suppressed`, and
+    the next record kept for the template carries how many were dropped before it.
+
+    Parameters:
+
+    * `?every: int = 1`: Keep 1 in `every` records of each template.
+    * `?rate: float`: The amount of records per second each template may log.
+    * `?burst: int`: The size of each template's token bucket. Defaults to `rate`, at least 1.
+    * `?max_templates: int = 1024`: The templates to track before they share one bucket.
+    """
+
+    def __init__(
+        self,
+        every: int = 1,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_templates: int = 1024,
+    ):
+        super().__init__()
+        if every < 1:
+            raise ValueError("`every` must be at least 1!")
+        self.every: int = every
+        self.rate: Optional[float] = rate
+        self.burst: float = float(burst if burst is not None else max(1, int(rate or 1)))
+        self.max_templates: int = max_templates
+        self.seen: Dict[str, int] = {}
+        self.suppressed: Dict[str, int] = {}
+        self.pending: Dict[str, int] = {}
+        self.buckets: Dict[str, List[float]] = {}
+
+    @property
+    def total_suppressed(self) -> int:
+        """The amount of records dropped for all templates."""
+        return sum(self.suppressed.values())
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        template = record.msg if isinstance(record.msg, str) else str(record.msg)
+        if template not in self.seen and len(self.seen) >= self.max_templates:
+            template = "*"
+
+        seen = self.seen.get(template, 0)
+        self.seen[template] = seen + 1
+        keep = seen % self.every == 0
+
+        if keep and self.rate is not None:
+            now = monotonic()
+            bucket = self.buckets.get(template)
+            if bucket is None:
+                bucket = self.buckets[template] = [self.burst, now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+            else:
+                keep = False
+
+        if not keep:
+            self.suppressed[template] = self.suppressed.get(template, 0) + 1
+            self.pending[template] = self.pending.get(template, 0) + 1
+            return False
+
+        record.suppressed = self.pending.pop(template, 0)
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    A `QueueHandler` for a bounded queue that never blocks the thread that logs.
+
+    When the queue is full, the record is dropped and counted in `dropped`. Records are queued
+    unformatted, with their template, arguments and exception, and are only formatted by the
+    handler of the listener, on its thread.
+
+    Parameters:
+
+    * `queue: Queue`: The queue to put records in.
+    """
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+
+def _formatter() -> logging.Formatter:
+    """Returns a new formatter for the library's handlers."""
+    return JSONFormatter() if Data.JSON_LOGS else CustomFormatter()
+
+
+def _library_handlers(_logger: logging.Logger) -> List[logging.Handler]:
+    """Returns the handlers of a logger that were attached by `get_logger`."""
+    return [
+        handler
+        for handler in _logger.handlers
+        if isinstance(handler.formatter, (CustomFormatter, JSONFormatter))
+        or handler is Data.QUEUE_HANDLER
+    ]
+
+
+def sample_logger(
+    logger: Union[logging.Logger, str],
+    every: int = 1,
+    rate: Optional[float] = None,
+    burst: Optional[int] = None,
+) -> SamplingFilter:
+    """
+    Samples the records of a logger, so diagnostics can stay on under load at a fixed cost.
+
+    ```py
+    from interactions.ext.enhanced import sample_logger, set_log_level
+
+    set_log_level(logging.INFO)
+    sampler = sample_logger("extension", every=10, rate=5)  # 1 in 10, then at most 5/s
+    ...
+    print(sampler.suppressed)
+    ```
+
+    Parameters:
+
+    * `logger: logging.Logger | str`: The logger, or its name.
+    * `?every: int = 1`: Keep 1 in `every` records of each message template.
+    * `?rate: float`: The amount of records per second each message template may log.
+    * `?burst: int`: The size of each template's token bucket.
+
+    Returns:
+
+    `SamplingFilter`: The filter, with the counters of suppressed records.
+    """
+    _logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+    for _filter in [f for f in _logger.filters if isinstance(f, SamplingFilter)]:
+        _logger.removeFilter(_filter)
+    sampler = SamplingFilter(every, rate, burst)
+    _logger.addFilter(sampler)
+    return sampler
+
+
+def set_log_level(level: Union[int, str]) -> None:
+    """
+    Changes the level of the library's loggers and of their handlers.
+
+    `Data.LOG_LEVEL` is only read when a logger is created, so changing it after the library was
+    imported does nothing. Use this instead.
+
+    ```py
+    from interactions.ext.enhanced import set_log_level
+
+    set_log_level(logging.INFO)
+    ```
+
+    Parameters:
+
+    * `level: int | str`: The level, such as `logging.INFO` or `"INFO"`.
+    """
+    level = logging.getLevelName(level) if isinstance(level, str) else level
+    Data.LOG_LEVEL = Data.LOGGER_LEVEL = level
+    handlers = {
+        id(handler): handler
+        for name in Data.LOGGERS
+        for handler in _library_handlers(logging.getLogger(name))
+    }
+    if Data.QUEUE_LISTENER is not None:
+        handlers.update({id(handler): handler for handler in Data.QUEUE_LISTENER.handlers})
+    for handler in handlers.values():
+        handler.setLevel(level)
+    for name in Data.LOGGERS:
+        logging.getLogger(name).setLevel(level)
+
+
+def use_json_logging(enabled: bool = True) -> None:
+    """
+    Switches the library's loggers between coloured and JSON output.
+
+    Parameters:
+
+    * `?enabled: bool = True`: Whether to write JSON.
+    """
+    Data.JSON_LOGS = enabled
+    handlers = {
+        id(handler): handler
+        for name in Data.LOGGERS
+        for handler in _library_handlers(logging.getLogger(name))
+        if handler is not Data.QUEUE_HANDLER
+    }
+    if Data.QUEUE_LISTENER is not None:
+        handlers.update({id(handler): handler for handler in Data.QUEUE_LISTENER.handlers})
+    for handler in handlers.values():
+        handler.setFormatter(_formatter())
+
+
+def start_queue_logging(
+    handler: Optional[logging.Handler] = None, maxsize: int = 10000
+) -> DroppingQueueHandler:
+    """
+    Moves the output of the library's loggers to a background thread.
+
+    Records are put in a bounded queue without blocking, and a `QueueListener` writes them with
+    `handler`. If the queue is full, records are dropped and counted.
+
+    ```py
+    from interactions.ext.enhanced import start_queue_logging
+
+    queue_handler = start_queue_logging(maxsize=5000)
+    ...
+    print(queue_handler.dropped)
+    ```
+
+    Parameters:
+
+    * `?handler: logging.Handler`: The handler that writes the records. Defaults to a `StreamHandler` to stderr.
+    * `?maxsize: int = 10000`: The maximum amount of records waiting to be written.
+
+    Returns:
+
+    `DroppingQueueHandler`: The handler the loggers now use, with the `dropped` counter.
+    """
+    if Data.QUEUE_HANDLER is not None:
+        stop_queue_logging()
+
+    handler = handler or logging.StreamHandler()
+    if handler.formatter is None:
+        handler.setFormatter(_formatter())
+    handler.setLevel(Data.LOG_LEVEL)
+
+    queue_handler = DroppingQueueHandler(Queue(maxsize))
+    queue_handler.setLevel(Data.LOG_LEVEL)
+    Data.QUEUE_HANDLER = queue_handler
+    Data.QUEUE_LISTENER = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    Data.QUEUE_LISTENER.start()
+
+    for name in Data.LOGGERS:
+        _logger = logging.getLogger(name)
+        for _handler in _library_handlers(_logger):
+            _logger.removeHandler(_handler)
+        _logger.addHandler(queue_handler)
+
+    return queue_handler
+
+
+def stop_queue_logging() -> None:
+    """
+    Writes the records left in the queue, stops the background thread, and gives the library's
+    loggers a `StreamHandler` again.
+    """
+    if Data.QUEUE_HANDLER is None:
+        return
+
+    Data.QUEUE_LISTENER.stop()
+    queue_handler, Data.QUEUE_HANDLER, Data.QUEUE_LISTENER = Data.QUEUE_HANDLER, None, None
+    for name in Data.LOGGERS:
+        _logger = logging.getLogger(name)
+        if queue_handler in _logger.handlers:
+            _logger.removeHandler(queue_handler)
+            get_logger(_logger)
 
 
 def get_logger(
     logger: Optional[Union[logging.Logger, str]] = None,
-    handler: Optional[logging.Handler] = logging.StreamHandler(),
+    handler: Optional[logging.Handler] = None,
 ) -> logging.Logger:
-    """Gets a logger for the library."""
+    """
+    Gets a logger for the library.
+
+    Each logger gets its own `StreamHandler` unless `handler` is given, or the shared queue
+    handler while `start_queue_logging` is active.
+
+    `Data.STRIP_DEBUG` and `set_log_level` change every logger created here, so the loggers of
+    new modules are named `enhanced.<module>`, which cannot belong to the application.
+    """
     _logger = logging.getLogger(logger) if isinstance(logger, str) else logger
     _logger_name = logger if isinstance(logger, str) else logger.name
     if len(_logger.handlers) > 1:
         _logger.removeHandler(_logger.handlers[0])
-    _handler = handler
-    _handler.setFormatter(CustomFormatter())
-    _handler.setLevel(Data.LOG_LEVEL)
+    if handler is None and Data.QUEUE_HANDLER is not None:
+        _handler = Data.QUEUE_HANDLER
+    else:
+        _handler = handler or logging.StreamHandler()
+        _handler.setFormatter(_formatter())
+        _handler.setLevel(Data.LOG_LEVEL)
     _logger.addHandler(_handler)
     _logger.propagate = True
+    if Data.LOGGER_LEVEL is not None:
+        _logger.setLevel(Data.LOGGER_LEVEL)
+    if Data.STRIP_DEBUG:
+        _logger.debug = _stripped
 
-    Data.LOGGERS.append(_logger_name)
+    if _logger_name not in Data.LOGGERS:
+        Data.LOGGERS.append(_logger_name)
     return _logger
@@ -0,0 +1,111 @@
+"""
+_timers
+
+Content:
+
+* TimerWheel: hashed timer wheel that expires many timeouts from a single task
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/_timers.py
+
+(c) 2022 interactions-py.
+"""
+from asyncio import Future, Task, TimeoutError, get_event_loop, sleep
+from math import ceil
+from typing import List, Optional, Set
+
+__all__ = ("TimerWheel",)
+
+
+class _Timer:
+    """A timeout scheduled on a `TimerWheel`."""
+
+    __slots__ = ("wheel", "future", "rounds", "slot")
+
+    def __init__(self, wheel: "TimerWheel", future: Future, rounds: int, slot: int):
+        self.wheel = wheel
+        self.future = future
+        self.rounds = rounds
+        self.slot = slot
+
+    def cancel(self) -> None:
+        """Cancels the timeout. Does nothing if it already expired."""
+        bucket = self.wheel.slots[self.slot]
+        if self in bucket:
+            bucket.remove(self)
+            self.wheel.size -= 1
+
+
+class TimerWheel:
+    """
+    A hashed timer wheel.
+
+    Every timeout is put in a slot in O(1), and a single task advances the wheel one slot per
+    tick, failing the futures of the timeouts that are due with `asyncio.TimeoutError`. The task
+    only runs while there are timeouts scheduled.
+
+    Parameters:
+
+    * `?tick: float = 0.1`: The resolution of the wheel, in seconds.
+    * `?slots: int = 512`: The number of slots in the wheel.
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick: float = tick
+        self.slots: List[Set[_Timer]] = [set() for _ in range(slots)]
+        self.cursor: int = 0
+        self.size: int = 0
+        self._task: Optional[Task] = None
+
+    def schedule(self, delay: float, future: Future) -> _Timer:
+        """
+        Schedules `future` to fail with `asyncio.TimeoutError` after `delay` seconds.
+
+        Parameters:
+
+        * `delay: float`: The amount of seconds before the timeout.
+        * `future: Future`: The future to time out.
+
+        Returns:
+
+        `_Timer`: The timeout, which can be cancelled.
+        """
+        ticks = max(1, ceil(delay / self.tick))
+        amount = len(self.slots)
+        slot = (self.cursor + ticks) % amount
+        timer = _Timer(self, future, (ticks - 1) // amount, slot)
+        self.slots[slot].add(timer)
+        self.size += 1
+
+        if self._task is None or self._task.done():
+            self._task = get_event_loop().create_task(self._run())
+        return timer
+
+    def clear(self) -> None:
+        """Cancels every timeout and stops the wheel."""
+        for bucket in self.slots:
+            bucket.clear()
+        self.size = 0
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = get_event_loop()
+        deadline = loop.time()
+        while self.size:
+            deadline += self.tick
+            await sleep(max(0.0, deadline - loop.time()))
+            self.cursor = (self.cursor + 1) % len(self.slots)
+            bucket = self.slots[self.cursor]
+            expired = []
+            for timer in bucket:
+                if timer.rounds:
+                    timer.rounds -= 1
+                else:
+                    expired.append(timer)
+
+            for timer in expired:
+                bucket.remove(timer)
+                self.size -= 1
+                if not timer.future.done():
+                    timer.future.set_exception(TimeoutError())
@@ -4,18 +4,39 @@ alt_ext
 Content:
 
 * AltExt: An alternate extension with enhanced syntax.
+* LazyAltExt: An `AltExt` module loaded on its first interaction.
 
 GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/alt_ext.py
 
 (c) 2022 interactions-py.
 """
-
-from functools import wraps
+import asyncio
+import json
+import os
+import sys
+import types
+from datetime import timedelta
 from importlib import import_module
+from importlib.util import find_spec
 from inspect import getmembers
-from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional, Union
-
-from interactions import Button, Client, Command, Extension, Modal, SelectMenu
+from logging import Logger
+from re import compile
+from time import monotonic
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+
+from interactions.api.dispatch import Listener
+
+from interactions import (
+    MISSING,
+    Button,
+    Client,
+    Command,
+    Extension,
+    Modal,
+    Option,
+    SelectMenu,
+    TextInput,
+)
 from interactions import extension_autocomplete as ext_auto
 from interactions import extension_command as ext_cmd
 from interactions import extension_component as ext_comp
@@ -24,18 +45,15 @@ from interactions import extension_message_command as ext_msg_cmd
 from interactions import extension_modal as ext_modal
 from interactions import extension_user_command as ext_user_cmd
 
-from .callbacks import extension_component, extension_modal
-
-__all__ = ("AltExt",)
-Coroutine = Callable[..., Union[Awaitable[Any], Coroutine]]
-
+from ._logging import get_logger
+from . import callbacks
+from .callbacks import ModalFields, extension_component, extension_modal
+from .profiler import profiled
 
-def remove_self(coro: Coroutine) -> Coroutine:
-    @wraps(coro)
-    async def wrapper(*args, **kwargs):
-        return await coro(*args[1:], **kwargs)
+__all__ = ("AltExt", "LazyAltExt")
 
-    return wrapper
+log: Logger = get_logger("alt_ext")
+Coroutine = Callable[..., Union[Awaitable[Any], Coroutine]]
 
 
 class AltExt:
@@ -112,6 +130,15 @@ class AltExt:
         self.__data[coro.name if isinstance(coro, Command) else coro.__name__] = coro
         return coro
 
+    def __add_handler(self, coro: Coroutine) -> Coroutine:
+        """
+        Adds a callback, stored as a `staticmethod` so the extension calls it without `self`,
+        as directly as a method of an `Extension`.
+        """
+        self.add(coro, coro)
+        self.__data[coro.__name__] = staticmethod(coro)
+        return coro
+
     def remove(self, name: str) -> Union[Command, Coroutine]:
         """
         Remove a method from the extension.
@@ -124,7 +151,8 @@ class AltExt:
 
         * `Union[Command, Coroutine]`: The method that was removed.
         """
-        return self.__data.pop(name)
+        method = self.__data.pop(name)
+        return method.__func__ if isinstance(method, staticmethod) else method
 
     def command(self, **kwargs) -> Callable[[Coroutine], Command]:
         """
@@ -146,8 +174,7 @@ class AltExt:
         """
 
         def decorator(_coro: Coroutine):
-            _coro: Coroutine = remove_self(_coro)
-            return self.add(ext_listener(_coro, name=name), _coro)
+            return self.__add_handler(ext_listener(_coro, name=name))
 
         return decorator(coro) if coro else decorator
 
@@ -159,7 +186,7 @@ class AltExt:
         """
 
         def decorator(coro: Coroutine) -> Coroutine:
-            return self.add(ext_comp(*args, **kwargs)(remove_self(coro)), coro)
+            return self.__add_handler(ext_comp(*args, **kwargs)(coro))
 
         return decorator
 
@@ -168,6 +195,7 @@ class AltExt:
         component: Union[str, Button, SelectMenu],
         startswith: Optional[bool] = False,
         regex: Optional[bool] = False,
+        coalesce: Optional[Union[float, timedelta]] = None,
     ) -> Callable[[Coroutine], Coroutine]:
         """
         A decorator to add an enhanced component callback to the extension.
@@ -176,8 +204,8 @@ class AltExt:
         """
 
         def decorator(coro: Coroutine) -> Coroutine:
-            return self.add(
-                extension_component(component, startswith, regex)(remove_self(coro)), coro
+            return self.__add_handler(
+                extension_component(component, startswith, regex, coalesce)(coro)
             )
 
         return decorator
@@ -190,7 +218,7 @@ class AltExt:
         """
 
         def decorator(coro: Coroutine) -> Coroutine:
-            return self.add(ext_auto(*args, **kwargs)(remove_self(coro)), coro)
+            return self.__add_handler(ext_auto(*args, **kwargs)(coro))
 
         return decorator
 
@@ -202,7 +230,7 @@ class AltExt:
         """
 
         def decorator(coro: Coroutine) -> Coroutine:
-            return self.add(ext_modal(*args, **kwargs)(remove_self(coro)), coro)
+            return self.__add_handler(ext_modal(*args, **kwargs)(coro))
 
         return decorator
 
@@ -211,6 +239,8 @@ class AltExt:
         modal: Union[str, Modal],
         startswith: Optional[bool] = False,
         regex: Optional[bool] = False,
+        fields: Optional[Union[ModalFields, Modal, List[TextInput]]] = None,
+        into: Optional[type] = None,
     ) -> Callable[[Coroutine], Coroutine]:
         """
         A decorator to add an enhanced modal callback to the extension.
@@ -219,7 +249,7 @@ class AltExt:
         """
 
         def decorator(coro: Coroutine) -> Coroutine:
-            return self.add(extension_modal(modal, startswith, regex)(remove_self(coro)), coro)
+            return self.__add_handler(extension_modal(modal, startswith, regex, fields, into)(coro))
 
         return decorator
 
@@ -231,7 +261,7 @@ class AltExt:
         """
 
         def decorator(coro: Coroutine) -> Coroutine:
-            return self.add(ext_msg_cmd(*args, **kwargs)(remove_self(coro)), coro)
+            return self.add(ext_msg_cmd(*args, **kwargs)(coro), coro)
 
         return decorator
 
@@ -243,7 +273,7 @@ class AltExt:
         """
 
         def decorator(coro: Coroutine) -> Coroutine:
-            return self.add(ext_user_cmd(*args, **kwargs)(remove_self(coro)), coro)
+            return self.add(ext_user_cmd(*args, **kwargs)(coro), coro)
 
         return decorator
 
@@ -251,6 +281,7 @@ class AltExt:
         """The default setup function for the extension."""
         return self(client, *args, **kwargs)
 
+    @profiled("AltExt", lambda self, *args, **kwargs: (self.name, "Extension"))
     def __call__(self, client: Client, *args, **kwargs) -> Extension:
         """Returns the extension in its `Extension` form."""
         self.client = client
@@ -270,3 +301,295 @@ class AltExt:
         for m in (m for _, m in getmembers(self.extension) if isinstance(m, Command)):
             m.extension = None
         return self.extension
+
+
+_MANIFEST_VERSION: int = 1
+_COMMAND_FIELDS: Tuple[str, ...] = (
+    "type",
+    "name",
+    "description",
+    "scope",
+    "default_member_permissions",
+    "dm_permission",
+    "name_localizations",
+    "description_localizations",
+    "default_scope",
+)
+
+
+class _Recorder(Client):
+    """A client that only records what an extension registers, so it can be called later."""
+
+    def __init__(self):  # no connection is ever made, so `Client.__init__` is skipped
+        self._websocket = types.SimpleNamespace(_dispatch=Listener(), ready=asyncio.Event())
+        self._commands = []
+        self._extensions = {}
+        self._automate_sync = False
+        self._Client__id_autocomplete = {}
+        self.component = types.MethodType(callbacks.component, self)
+        self.modal = types.MethodType(callbacks.modal, self)
+
+    def _Client__resolve_commands(self):
+        pass
+
+
+def _source(module: str) -> List[int]:
+    """Returns the modification time and size of a module's file, without importing it."""
+    spec = find_spec(module)
+    if spec is None:
+        raise ImportError(f"No module named {module!r}")
+    if not spec.origin or not os.path.exists(spec.origin):
+        return [0, 0]
+    stat = os.stat(spec.origin)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class LazyAltExt:
+    """
+    An `AltExt` module that is only imported on the first interaction that targets it.
+
+    Its commands, callbacks and listeners are registered up front from a manifest, a JSON file
+    holding their schemas and event names. The first time one of them is used, the module is
+    imported and its `AltExt` is built, then every call goes to the real callback. If `idle`
+    is given, the module is dropped again once it has not been used for that long.
+
+    ```py
+    # main.py
+    bot.load("interactions.ext.enhanced")
+    LazyAltExt("exts.tickets", idle=600)(bot)
+    ```
+
+    The manifest is written the first time, and whenever the module's file changes, by importing
+    the module right away.
+
+    Parameters:
+
+    * `module: str`: The name of the module defining the `AltExt`, as in `client.load`.
+    * `?manifest: str = ".enhanced_lazy.json"`: The file the manifests of lazy modules are kept in.
+    * `?idle: float | timedelta`: How long the module may go unused before it is dropped. Defaults to never.
+    * `?name: str`: The name of the `AltExt`, if the module has more than one.
+
+    Additional attributes:
+
+    * `client: Optional[Client]`: The client the extension is registered in.
+    * `loads: int`: How many times the module was loaded.
+    """
+
+    def __init__(
+        self,
+        module: str,
+        manifest: str = ".enhanced_lazy.json",
+        *,
+        idle: Optional[Union[float, timedelta]] = None,
+        name: Optional[str] = None,
+    ):
+        self.module: str = module
+        self.manifest: str = manifest
+        self.idle: Optional[float] = idle.total_seconds() if isinstance(idle, timedelta) else idle
+        self.name: Optional[str] = name
+        self.client: Optional[Client] = None
+        self.loads: int = 0
+        self._recorder: Optional[_Recorder] = None
+        self._commands: Dict[str, Callable[..., Awaitable]] = {}
+        self._last_used: float = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the module is loaded."""
+        return self._recorder is not None
+
+    def __read(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest, encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            log.warning("Discarding the lazy extension manifests at %s: %s", self.manifest, error)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != _MANIFEST_VERSION:
+            return {}
+        return data.get("modules", {})
+
+    def __write(self, entry: Dict[str, Any]) -> None:
+        modules = self.__read()
+        modules[self.module] = entry
+        temp = f"{self.manifest}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": _MANIFEST_VERSION, "modules": modules},
+                file,
+                separators=(",", ":"),
+                default=int,
+            )
+        os.replace(temp, self.manifest)
+
+    def __find(self, module: types.ModuleType) -> AltExt:
+        exts = [value for value in vars(module).values() if isinstance(value, AltExt)]
+        if self.name is not None:
+            exts = [ext for ext in exts if ext.name == self.name]
+        if len(exts) != 1:
+            raise ValueError(
+                f"Expected one AltExt{f' named {self.name!r}' if self.name else ''} in "
+                f"{self.module}, found {len(exts)}!"
+            )
+        return exts[0]
+
+    @profiled("LazyAltExt", lambda self: (self.module, "load"))
+    def load(self) -> None:
+        """Imports the module and builds its `AltExt`, if it is not loaded."""
+        if self._recorder is not None:
+            return
+
+        ext = self.__find(import_module(self.module))
+        recorder = _Recorder()
+        extension = ext(recorder)
+        ext.client = extension.client = self.client
+        for cmd in recorder._commands:
+            cmd.client = self.client
+            if self.client is not None:
+                cmd.listener = self.client._websocket._dispatch
+
+        self._recorder = recorder
+        self._commands = {cmd.name: cmd.dispatcher for cmd in recorder._commands}
+        self.loads += 1
+        log.debug("Loaded the lazy extension %s", self.module)
+
+    def unload(self) -> None:
+        """Drops the module, so it is imported again on its next interaction."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._recorder is None:
+            return
+        self._recorder = None
+        self._commands = {}
+        sys.modules.pop(self.module, None)
+        log.debug("Unloaded the idle lazy extension %s", self.module)
+
+    def __expire(self) -> None:
+        self._timer = None
+        remaining = self._last_used + self.idle - monotonic()
+        if remaining > 0:
+            self._timer = asyncio.get_running_loop().call_later(remaining, self.__expire)
+        else:
+            self.unload()
+
+    def __use(self) -> None:
+        self.load()
+        self._last_used = monotonic()
+        if self.idle is not None and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.idle, self.__expire)
+
+    def __describe(self) -> Dict[str, Any]:
+        """Builds the manifest of the loaded module."""
+        commands = []
+        for cmd in self._recorder._commands:
+            data = {
+                key: getattr(cmd, key)
+                for key in _COMMAND_FIELDS
+                if getattr(cmd, key) not in (MISSING, None)
+            }
+            data["options"] = [
+                {**option._json, **({"converter": option.converter} if option.converter else {})}
+                for option in cmd.options
+            ]
+            commands.append(data)
+
+        events = []
+        for event, funcs in self._recorder._websocket._dispatch.events.items():
+            for func in funcs:
+                entry: Dict[str, Any] = {"name": event}
+                if hasattr(func, "startswith"):
+                    entry["startswith"] = True
+                elif hasattr(func, "regex"):
+                    entry["regex"] = func.regex.pattern
+                events.append(entry)
+
+        id_autocomplete = [
+            [str(command_id), autocomplete["name"]]
+            for command_id, autocompletes in self._recorder._Client__id_autocomplete.items()
+            for autocomplete in autocompletes
+        ]
+        return {
+            "source": _source(self.module),
+            "commands": commands,
+            "events": events,
+            "id_autocomplete": id_autocomplete,
+        }
+
+    def __command(self, name: str) -> Callable[..., Awaitable]:
+        async def command(ctx, *args, **kwargs):
+            self.__use()
+            return await self._commands[name](ctx, *args, **kwargs)
+
+        command.__name__ = name
+        return command
+
+    def __event(self, event: str, index: int) -> Callable[..., Awaitable]:
+        async def callback(*args, **kwargs):
+            self.__use()
+            return await self._recorder._websocket._dispatch.events[event][index](*args, **kwargs)
+
+        callback.__name__ = event
+        return callback
+
+    def __id_autocomplete(self, command_id: str, option: str) -> Callable[..., Awaitable]:
+        async def callback(*args, **kwargs):
+            self.__use()
+            for autocomplete in self._recorder._Client__id_autocomplete[int(command_id)]:
+                if autocomplete["name"] == option:
+                    return await autocomplete["coro"](*args, **kwargs)
+
+        callback.__name__ = f"autocomplete_{command_id}_{option}"
+        return callback
+
+    def __call__(self, client: Client) -> "LazyAltExt":
+        """Registers the commands and callbacks of the module in the client."""
+        self.client = client
+        entry = self.__read().get(self.module)
+        if entry is None or entry.get("source") != _source(self.module):
+            log.info("Writing the manifest of the lazy extension %s", self.module)
+            self.load()
+            entry = self.__describe()
+            self.__write(entry)
+
+        for data in entry["commands"]:
+            options = [Option(**option) for option in data["options"]]
+            cmd = Command(
+                coro=self.__command(data["name"]),
+                options=options,
+                **{key: value for key, value in data.items() if key != "options"},
+            )
+            if cmd.name in {_cmd.name for _cmd in client._commands}:
+                continue
+            cmd.client = client
+            client._commands.append(cmd)
+
+        seen: Dict[str, int] = {}
+        for event in entry["events"]:
+            index = seen[event["name"]] = seen.get(event["name"], -1) + 1
+            callback = self.__event(event["name"], index)
+            if event.get("startswith"):
+                callback.startswith = True
+            elif "regex" in event:
+                callback.regex = compile(event["regex"])
+            client.event(callback, name=event["name"])
+
+        for command_id, option in entry["id_autocomplete"]:
+            client._Client__id_autocomplete.setdefault(int(command_id), []).append(
+                {"coro": self.__id_autocomplete(command_id, option), "name": option}
+            )
+
+        client._Client__resolve_commands()
+        if client._websocket.ready.is_set() and client._automate_sync:
+            client._loop.create_task(client._Client__sync())
+
+        log.debug(
+            "Registered the lazy extension %s (%d commands, %d events)",
+            self.module,
+            len(entry["commands"]),
+            len(entry["events"]),
+        )
+        return self
@@ -0,0 +1,460 @@
+"""
+autocomplete
+
+Content:
+
+* AutocompleteIndex: prefix and fuzzy index answering autocomplete interactions
+* AutocompleteHandler: autocomplete callback wrapper cancelling stale keystrokes and caching
+* autocomplete_handler: decorator creating an `AutocompleteHandler`
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/autocomplete.py
+
+(c) 2022 interactions-py.
+"""
+from asyncio import Task, TimeoutError, current_task, get_running_loop, wait_for
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from functools import update_wrapper
+from inspect import isawaitable
+from logging import Logger
+from math import ceil
+from time import monotonic, time
+from types import MethodType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from interactions import Choice
+from interactions.client.context import _Context
+
+from ._logging import get_logger
+
+__all__ = ("AutocompleteIndex", "AutocompleteHandler", "autocomplete_handler")
+
+log: Logger = get_logger("enhanced.autocomplete")
+
+_UNSET = object()
+_numpy_module: Any = _UNSET
+
+
+def _numpy():
+    """Imports NumPy on first use, returning `None` if it is not installed."""
+    global _numpy_module
+    if _numpy_module is _UNSET:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module = numpy
+    return _numpy_module
+
+
+def __getattr__(name: str) -> Any:
+    if name == "numpy":
+        return _numpy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+Source = Union[Iterable[Any], Callable[[], Union[Iterable[Any], Awaitable[Iterable[Any]]]]]
+
+
+class _State(NamedTuple):
+    """An immutable build of an `AutocompleteIndex`, swapped in whole on refresh."""
+
+    choices: List[dict]
+    order: List[int]
+    sorted_names: List[str]
+    grams: Dict[str, Any]
+
+
+def _ngrams(text: str, n: int) -> List[str]:
+    """Returns the distinct n-grams of a padded string."""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return [padded]
+    return list({padded[i : i + n] for i in range(len(padded) - n + 1)})
+
+
+def _choice(item: Any) -> dict:
+    """Turns a string, `(name, value)` pair, `Choice` or dict into a choice payload."""
+    if isinstance(item, Choice):
+        item = item._json
+    if isinstance(item, dict):
+        name, value = item["name"], item["value"]
+    elif isinstance(item, tuple):
+        name, value = item
+    else:
+        name = value = str(item)
+    return {"name": str(name)[:100], "value": value[:100] if isinstance(value, str) else value}
+
+
+def _focused(options: list) -> Optional[Tuple[str, Any]]:
+    """Finds the name and value of the focused option."""
+    for option in options:
+        data = option if isinstance(option, dict) else option._json
+        if data.get("focused"):
+            return data["name"], data.get("value")
+        if data.get("options"):
+            found = _focused(data["options"])
+            if found is not None:
+                return found
+    return None
+
+
+def _subcommand_path(options: list) -> str:
+    """The subcommand of the options, as `"sub"` or `"group sub"`, or `""` for the base."""
+    path = []
+    while options:
+        data = options[0] if isinstance(options[0], dict) else options[0]._json
+        if int(data.get("type", 0)) not in {1, 2}:
+            break
+        path.append(data["name"])
+        options = data.get("options") or []
+    return " ".join(path)
+
+
+class AutocompleteIndex:
+    """
+    An index of choices that answers autocomplete interactions by itself.
+
+    The index is built once, with a sorted array of names searched with `bisect` for prefixes,
+    and an n-gram index for fuzzy matches, scored with NumPy if it is installed. Choices are
+    stored as payloads, so a search only slices lists.
+
+    ```py
+    @bot.command()
+    @setup_options
+    async def item(ctx, name: EnhancedOption(str, "The item", autocomplete_source=ITEMS)):
+        ...
+    ```
+
+    Parameters:
+
+    * `source: Iterable | Callable[[], Iterable | Awaitable[Iterable]]`: The choices, as strings, `(name, value)` pairs, `Choice`s or dicts, or a function or coroutine returning them.
+    * `?refresh: float`: The amount of seconds after which a callable source is loaded again, in the background.
+    * `?ngram: int = 3`: The length of the n-grams of the fuzzy index.
+    * `?use_numpy: bool`: Whether to score fuzzy matches with NumPy. Defaults to whether it is installed.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        *,
+        refresh: Optional[float] = None,
+        ngram: int = 3,
+        use_numpy: Optional[bool] = None,
+    ):
+        numpy = _numpy() if use_numpy is not False else None
+        if use_numpy and numpy is None:
+            raise ImportError("`use_numpy` requires numpy to be installed!")
+        self.source: Source = source
+        self.refresh: Optional[float] = refresh
+        self.ngram: int = ngram
+        self._numpy = numpy
+        self._state: Optional[_State] = None
+        self._built_at: float = 0.0
+        self._reloading: Optional[Task] = None
+
+        if not callable(source):
+            self._swap(self._build(source))
+
+    def __len__(self) -> int:
+        return len(self._state.choices) if self._state else 0
+
+    def _build(self, items: Iterable[Any]) -> _State:
+        choices = [_choice(item) for item in items]
+        names = [choice["name"].casefold() for choice in choices]
+        order = sorted(range(len(names)), key=names.__getitem__)
+
+        grams: Dict[str, Any] = {}
+        for i, name in enumerate(names):
+            for gram in _ngrams(name, self.ngram):
+                grams.setdefault(gram, []).append(i)
+        if self._numpy is not None:
+            grams = {
+                gram: self._numpy.array(postings, dtype=self._numpy.int32)
+                for gram, postings in grams.items()
+            }
+
+        return _State(choices, order, [names[i] for i in order], grams)
+
+    def _swap(self, state: _State) -> None:
+        self._state = state
+        self._built_at = monotonic()
+        log.debug("Indexed %d choices for autocomplete", len(state.choices))
+
+    async def reload(self) -> None:
+        """Loads the source again and rebuilds the index off the event loop."""
+        items = self.source() if callable(self.source) else self.source
+        if isawaitable(items):
+            items = await items
+        self._swap(await get_running_loop().run_in_executor(None, self._build, list(items)))
+
+    def search(self, query: str, limit: int = 25) -> List[dict]:
+        """
+        Searches the index.
+
+        Names starting with the query come first, in alphabetical order, followed by fuzzy
+        matches sharing the most n-grams with it.
+
+        Parameters:
+
+        * `query: str`: What the user typed.
+        * `?limit: int = 25`: The maximum amount of choices.
+
+        Returns:
+
+        `list[dict]`: The choice payloads, which `ctx.populate` accepts.
+        """
+        state = self._state
+        if state is None:
+            return []
+
+        query = query.strip().casefold()
+        if not query:
+            return [state.choices[i] for i in state.order[:limit]]
+
+        names = state.sorted_names
+        position = bisect_left(names, query)
+        end = min(len(names), position + limit)
+        while end > position and not names[end - 1].startswith(query):
+            end -= 1
+        found = state.order[position:end]
+
+        if len(found) < limit:
+            found += self._fuzzy(state, query, limit - len(found), set(found))
+        return [state.choices[i] for i in found]
+
+    def _fuzzy(self, state: _State, query: str, limit: int, exclude: set) -> List[int]:
+        query_grams = _ngrams(query, self.ngram)
+        postings = [state.grams[gram] for gram in query_grams if gram in state.grams]
+        if not postings:
+            return []
+        minimum = max(1, ceil(len(query_grams) / 3))
+
+        if self._numpy is not None:
+            np = self._numpy
+            ids, counts = np.unique(np.concatenate(postings), return_counts=True)
+            keep = counts >= minimum
+            if exclude:
+                keep &= ~np.isin(ids, list(exclude))
+            ids, counts = ids[keep], counts[keep]
+            if len(ids) > limit:
+                top = np.argpartition(-counts, limit - 1)[:limit]
+                ids, counts = ids[top], counts[top]
+            return ids[np.argsort(-counts, kind="stable")].tolist()
+
+        counts = Counter(i for posting in postings for i in posting if i not in exclude)
+        return [i for i, count in counts.most_common(limit) if count >= minimum]
+
+    async def complete(self, query: str, limit: int = 25) -> List[dict]:
+        """
+        Searches the index, loading a callable source the first time and refreshing it in the
+        background once it is older than `refresh`.
+
+        Parameters:
+
+        * `query: str`: What the user typed.
+        * `?limit: int = 25`: The maximum amount of choices.
+
+        Returns:
+
+        `list[dict]`: The choice payloads, which `ctx.populate` accepts.
+        """
+        if self._state is None:
+            await self.reload()
+        elif (
+            self.refresh is not None
+            and callable(self.source)
+            and monotonic() - self._built_at > self.refresh
+            and (self._reloading is None or self._reloading.done())
+        ):
+            self._reloading = get_running_loop().create_task(self.reload())
+        return self.search(query, limit)
+
+
+DISCORD_EPOCH: int = 1420070400000
+
+
+def _in_name(query: str, choice: dict) -> bool:
+    """Whether the query is in the name of a choice."""
+    return query in choice["name"].casefold()
+
+
+class AutocompleteHandler:
+    """
+    Wraps an autocomplete callback that returns its choices, so that only the latest keystroke
+    is worked on.
+
+    * A newer keystroke of the same user on the same option cancels the task still working on
+      the previous one.
+    * Results are kept in a small LRU per option. A repeated query is served from it, and so is a
+      query extending a cached one whose results were not cut off at 25, by narrowing them down
+      with `narrow`.
+    * The callback is cancelled, and nothing is sent, once the 3 second deadline of the
+      interaction has passed, as Discord would reject the response anyway.
+
+    ```py
+    @bot.autocomplete(command="item", name="name")
+    @autocomplete_handler(cache_size=256)
+    async def item_autocomplete(ctx, value: str = ""):
+        return await search_items(value)  # strings, (name, value) pairs, Choices or dicts
+    ```
+
+    It can also be given to `EnhancedOption(autocomplete_source=...)`.
+
+    Parameters:
+
+    * `coro: Callable[..., Awaitable]`: The callback, returning the choices.
+    * `?cache_size: int = 128`: The amount of queries cached per option. `0` disables caching.
+    * `?ttl: float = 60`: The amount of seconds results are cached for.
+    * `?narrow: Callable[[str, dict], bool] | None`: Whether a cached choice matches a longer query. Defaults to the query being in its name. `None` only serves repeated queries.
+    * `?deadline: float = 3`: The amount of seconds after the interaction was created to give up.
+    """
+
+    def __init__(
+        self,
+        coro: Callable[..., Awaitable],
+        *,
+        cache_size: int = 128,
+        ttl: float = 60,
+        narrow: Optional[Callable[[str, dict], bool]] = _in_name,
+        deadline: float = 3,
+    ):
+        update_wrapper(self, coro)
+        self.coro = coro
+        self.cache_size: int = cache_size
+        self.ttl: float = ttl
+        self.narrow = narrow
+        self.deadline: float = deadline
+        self.hits: int = 0
+        self.misses: int = 0
+        self.cancelled: int = 0
+        self.dropped: int = 0
+        self._caches: Dict[Tuple[str, str, str], OrderedDict] = {}
+        self._inflight: Dict[Tuple[str, str, str, str], Task] = {}
+
+    def __get__(self, instance, owner):
+        """Binds the handler when it is used as a method of an `Extension`."""
+        return self if instance is None else MethodType(self, instance)
+
+    def _cached(self, option: Tuple[str, str, str], query: str) -> Optional[List[dict]]:
+        cache = self._caches.get(option)
+        if not cache:
+            return None
+        now = monotonic()
+
+        entry = cache.get(query)
+        if entry is not None and entry[0] > now:
+            cache.move_to_end(query)
+            return entry[1]
+
+        if self.narrow is None:
+            return None
+        for cached_query in range(len(query) - 1, -1, -1):
+            entry = cache.get(query[:cached_query])
+            if entry is not None and entry[0] > now and len(entry[1]) < 25:
+                return [choice for choice in entry[1] if self.narrow(query, choice)]
+        return None
+
+    def _store(self, option: Tuple[str, str, str], query: str, choices: List[dict]) -> None:
+        if self.cache_size <= 0:
+            return
+        cache = self._caches.setdefault(option, OrderedDict())
+        cache[query] = (monotonic() + self.ttl, choices)
+        cache.move_to_end(query)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    async def __call__(self, *args, **kwargs):
+        index = 0 if isinstance(args[0], _Context) else 1
+        ctx = args[index]
+        value = args[index + 1] if len(args) > index + 1 else kwargs.get("value", "")
+
+        focused = _focused(ctx.data.options or [])
+        # one callback may serve the same option of several subcommands
+        option = (
+            ctx.data.name,
+            _subcommand_path(ctx.data.options or []),
+            focused[0] if focused else "",
+        )
+        query = str(value or "").casefold()
+
+        choices = self._cached(option, query)
+        if choices is not None:
+            self.hits += 1
+            return await ctx.populate(choices[:25])
+        self.misses += 1
+
+        user = ctx.member.user if ctx.member else ctx.user
+        key = (str(user.id), *option)
+        previous = self._inflight.get(key)
+        if previous is not None and not previous.done():
+            previous.cancel()
+            self.cancelled += 1
+        task = current_task()
+        self._inflight[key] = task
+
+        created = ((int(ctx.id) >> 22) + DISCORD_EPOCH) / 1000
+        remaining = created + self.deadline - time()
+        try:
+            if remaining <= 0:
+                raise TimeoutError
+            result = await wait_for(self.coro(*args, **kwargs), timeout=remaining)
+        except TimeoutError:
+            self.dropped += 1
+            log.debug("Dropped autocomplete for %r past its deadline", value)
+            return
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+        if result is None:  # the callback populated the choices itself
+            return
+        choices = [_choice(item) for item in result]
+        self._store(option, query, choices)
+        return await ctx.populate(choices[:25])
+
+
+def autocomplete_handler(
+    coro: Callable[..., Awaitable] = None,
+    *,
+    cache_size: int = 128,
+    ttl: float = 60,
+    narrow: Optional[Callable[[str, dict], bool]] = _in_name,
+    deadline: float = 3,
+):
+    """
+    Wraps an autocomplete callback that returns its choices in an `AutocompleteHandler`.
+
+    ```py
+    @bot.autocomplete(command="item", name="name")
+    @autocomplete_handler
+    async def item_autocomplete(ctx, value: str = ""):
+        return await search_items(value)
+    ```
+
+    Parameters:
+
+    * `(X)coro: Callable[..., Awaitable]`: The callback, returning the choices.
+    * `?cache_size: int = 128`: The amount of queries cached per option. `0` disables caching.
+    * `?ttl: float = 60`: The amount of seconds results are cached for.
+    * `?narrow: Callable[[str, dict], bool] | None`: Whether a cached choice matches a longer query. `None` only serves repeated queries.
+    * `?deadline: float = 3`: The amount of seconds after the interaction was created to give up.
+    """
+    if coro is None:
+        return lambda coro: AutocompleteHandler(
+            coro, cache_size=cache_size, ttl=ttl, narrow=narrow, deadline=deadline
+        )
+    return AutocompleteHandler(
+        coro, cache_size=cache_size, ttl=ttl, narrow=narrow, deadline=deadline
+    )
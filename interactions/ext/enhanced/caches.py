@@ -0,0 +1,417 @@
+"""
+caches
+
+Content:
+
+* cached: response cache decorator
+* CacheInfo: hit and miss counters of a response cache
+* single_flight: concurrent invocation coalescing decorator
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/caches.py
+
+(c) 2022 interactions-py.
+"""
+import asyncio
+from collections import OrderedDict
+from datetime import timedelta
+from functools import wraps
+from time import monotonic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from interactions.client.context import _Context
+
+from interactions import Command, CommandContext, Extension
+
+from ._logging import get_logger
+
+__all__ = ("cached", "CacheInfo", "single_flight")
+
+log = get_logger("enhanced.caches")
+Coroutine = Callable[..., Awaitable]
+_Response = Tuple[str, dict]
+
+
+class CacheInfo(NamedTuple):
+    """
+    The counters of a response cache.
+
+    Parameters:
+
+    * `hits: int`: How many interactions were answered from the cache.
+    * `misses: int`: How many interactions ran the command.
+    * `maxsize: int`: The most responses kept at once.
+    * `size: int`: The amount of responses kept, including expired ones not evicted yet.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    size: int
+
+
+class _Recorder:
+    """Stands in for the HTTP client of a context, recording the responses sent through it."""
+
+    __slots__ = ("_http", "responses", "replayable", "merge", "recorded")
+
+    def __init__(self, http, merge: bool = True, recorded: Optional[Callable[[], None]] = None):
+        self._http = http
+        self.responses: List[_Response] = []
+        self.replayable: bool = True
+        self.merge: bool = merge
+        self.recorded: Optional[Callable[[], None]] = recorded
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._http, name)
+
+    async def create_interaction_response(self, token: str, application_id: int, data: dict):
+        self.responses.append(("create", data))
+        if self.recorded is not None:
+            self.recorded()
+        return await self._http.create_interaction_response(token, application_id, data)
+
+    async def edit_interaction_response(
+        self, data: dict, token: str, application_id: str, message_id: str = "@original"
+    ) -> dict:
+        last = self.responses[-1] if self.responses else None
+        if message_id != "@original":  # a follow-up, which a replay has no id for
+            self.replayable = False
+        elif self.merge and last is not None and last[0] == "create" and last[1].get("type") == 5:
+            # a deferred response and its edit are replayed as one response
+            flags = (last[1].get("data") or {}).get("flags")
+            self.responses[-1] = (
+                "create",
+                {"type": 4, "data": {**({"flags": flags} if flags else {}), **data}},
+            )
+        else:
+            self.responses.append(("edit", data))
+            if self.recorded is not None:
+                self.recorded()
+        return await self._http.edit_interaction_response(data, token, application_id, message_id)
+
+    async def _post_followup(self, data: dict, token: str, application_id: str) -> dict:
+        self.responses.append(("followup", data))
+        if self.recorded is not None:
+            self.recorded()
+        return await self._http._post_followup(data, token, application_id)
+
+
+def _options_key(options) -> tuple:
+    return tuple(
+        (option.name, option.value, _options_key(option.options or ())) for option in options
+    )
+
+
+def _get_key(
+    key: Union[str, Callable[[CommandContext], Hashable]], ctx: CommandContext
+) -> Hashable:
+    if callable(key):
+        return key(ctx)
+    options = _options_key(ctx.data.options or ())
+    target = getattr(ctx.data, "target_id", None)
+    if target is not None:  # user and message commands have a target instead of options
+        options = (str(target), options)
+    if key == "user":
+        return str(ctx.user.id), options
+    if key == "guild":
+        return str(ctx.guild_id), options
+    return options
+
+
+async def _replay(ctx: CommandContext, responses: List[_Response]) -> None:
+    http = ctx._client
+    for kind, data in responses:
+        if kind == "create":
+            await http.create_interaction_response(
+                token=ctx.token, application_id=int(ctx.id), data=data
+            )
+            ctx.responded = True
+            ctx.deferred = data.get("type") == 5
+        elif kind == "edit":
+            await http.edit_interaction_response(
+                data=data, token=ctx.token, application_id=str(ctx.application_id)
+            )
+        else:
+            await http._post_followup(
+                data=data, token=ctx.token, application_id=str(ctx.application_id)
+            )
+
+
+class cached:
+    """
+    A decorator for replaying the response of a command instead of running it again.
+
+    The response payloads a command sends are kept for `ttl`, and later invocations with the same
+    key are answered with them, without running the command.
+
+    ```py
+    from interactions.ext.enhanced import cached
+
+    @client.command(...)
+    @cached(ttl=60, key="guild")
+    async def leaderboard(ctx, ...):
+        ...
+    ```
+
+    Only responses to the interaction itself are replayed: deferring, sending, editing the
+    original response and follow-ups. Nothing else the command does is, so only cache commands
+    that answer the same way every time for the same key.
+
+    Parameters:
+
+    * `ttl: float | timedelta`: How long, in seconds, a response is replayed for.
+    * `?key: str | Callable[[CommandContext], Hashable] = "options"`: What makes responses the same. `"options"` for the same options, or target of user and message commands, `"user"` or `"guild"` for the same options in the same user or guild, or a function returning the key of a context.
+    * `?maxsize: int = 128`: The most responses to keep. The least recently used are evicted first.
+    """
+
+    def __init__(
+        self,
+        ttl: Union[float, timedelta],
+        *,
+        key: Union[str, Callable[[CommandContext], Hashable]] = "options",
+        maxsize: int = 128,
+    ):
+        self.ttl: float = ttl.total_seconds() if isinstance(ttl, timedelta) else ttl
+        if self.ttl <= 0:
+            raise ValueError("`ttl` must be a positive amount of seconds!")
+        if key not in {"options", "user", "guild"} and not callable(key):
+            raise TypeError("Invalid type provided for `key`! Must be a `str` or a function!")
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be at least 1!")
+
+        self.key: Union[str, Callable[[CommandContext], Hashable]] = key
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self.responses: "OrderedDict[Hashable, Tuple[float, List[_Response], Any]]" = OrderedDict()
+
+    def __call__(self, coro: Coroutine) -> Coroutine:
+        if isinstance(coro, Command):
+            raise SyntaxError("Caches must go below command decorators!")
+
+        coro.cached = self
+
+        @wraps(coro)
+        async def wrapper(ctx: Union[CommandContext, Extension], *args, **kwargs):
+            _ctx: CommandContext = ctx if isinstance(ctx, _Context) else args[0]
+            key = self.get_key(_ctx)
+            now = monotonic()
+
+            entry = self.responses.get(key)
+            if entry is not None and entry[0] > now:
+                self.responses.move_to_end(key)
+                self.hits += 1
+                await self.replay(_ctx, entry[1])
+                return entry[2]
+
+            if entry is not None:
+                del self.responses[key]
+            self.misses += 1
+            http = _ctx._client
+            recorder = _Recorder(http)
+            _ctx._client = recorder
+            try:
+                result = await coro(ctx, *args, **kwargs)
+            finally:
+                _ctx._client = http
+
+            if recorder.responses and recorder.replayable:
+                self.responses[key] = (monotonic() + self.ttl, recorder.responses, result)
+                self.responses.move_to_end(key)
+                while len(self.responses) > self.maxsize:
+                    self.responses.popitem(last=False)
+            return result
+
+        return wrapper
+
+    def get_key(self, ctx: CommandContext) -> Hashable:
+        """
+        Returns the key of the response to a context.
+
+        Parameters:
+
+        * `ctx: CommandContext`: The context to get the key of.
+        """
+        return _get_key(self.key, ctx)
+
+    async def replay(self, ctx: CommandContext, responses: List[_Response]) -> None:
+        """
+        Sends recorded responses to a context.
+
+        Parameters:
+
+        * `ctx: CommandContext`: The context to respond to.
+        * `responses: list[tuple[str, dict]]`: The responses, as recorded.
+        """
+        await _replay(ctx, responses)
+        log.debug("Replayed %d cached responses", len(responses))
+
+    def info(self) -> CacheInfo:
+        """
+        Returns the hit and miss counters of the cache.
+
+        Returns:
+
+        `CacheInfo`
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.responses))
+
+    def clear(self, key: Optional[Hashable] = None):
+        """
+        Forgets cached responses.
+
+        ```py
+        @client.command(...)
+        @cached(ttl=60)
+        async def leaderboard(ctx, ...):
+            ...
+
+        leaderboard.coro.cached.clear()
+        ```
+
+        Parameters:
+
+        * `?key: Hashable`: The key of the response to forget. If not provided, every response is forgotten.
+        """
+        if key is not None:
+            self.responses.pop(key, None)
+        else:
+            self.responses.clear()
+
+
+class _Flight:
+    """An invocation of a `single_flight` command that others with the same key wait on."""
+
+    __slots__ = ("recorder", "changed", "finished", "result", "error")
+
+    def __init__(self, http):
+        self.changed: asyncio.Event = asyncio.Event()
+        self.recorder: _Recorder = _Recorder(http, merge=False, recorded=self.changed.set)
+        self.finished: bool = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def finish(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        self.result = result
+        self.error = error
+        self.finished = True
+        self.changed.set()
+
+
+class single_flight:
+    """
+    A decorator for running a command once for concurrent invocations with the same key.
+
+    While the command runs, other invocations with the same key do not run it, but wait for it
+    and send the same responses to their own interaction, as they are sent.
+
+    ```py
+    from interactions.ext.enhanced import single_flight
+
+    @client.command(...)
+    @single_flight(key="options")
+    async def stats(ctx, ...):
+        await ctx.defer()
+        ...  # an expensive query
+        await ctx.send(...)
+    ```
+
+    Responses are mirrored as they are sent, so deferring early defers every waiting
+    interaction too. Only responses to the interaction itself are mirrored, and edits of
+    follow-up messages are not. If the command raises, the error is raised in every waiting
+    invocation.
+
+    Parameters:
+
+    * `?key: str | Callable[[CommandContext], Hashable] = "options"`: What makes invocations the same. `"options"` for the same options, or target of user and message commands, `"user"` or `"guild"` for the same options in the same user or guild, or a function returning the key of a context.
+    """
+
+    def __init__(self, *, key: Union[str, Callable[[CommandContext], Hashable]] = "options"):
+        if key not in {"options", "user", "guild"} and not callable(key):
+            raise TypeError("Invalid type provided for `key`! Must be a `str` or a function!")
+
+        self.key: Union[str, Callable[[CommandContext], Hashable]] = key
+        self.flights: Dict[Hashable, _Flight] = {}
+        self.runs: int = 0
+        self.joined: int = 0
+
+    def __call__(self, coro: Coroutine) -> Coroutine:
+        if isinstance(coro, Command):
+            raise SyntaxError("Single flights must go below command decorators!")
+
+        coro.single_flight = self
+
+        @wraps(coro)
+        async def wrapper(ctx: Union[CommandContext, Extension], *args, **kwargs):
+            _ctx: CommandContext = ctx if isinstance(ctx, _Context) else args[0]
+            key = _get_key(self.key, _ctx)
+
+            flight = self.flights.get(key)
+            if flight is not None:
+                self.joined += 1
+                return await self.follow(_ctx, flight)
+
+            self.runs += 1
+            http = _ctx._client
+            flight = self.flights[key] = _Flight(http)
+            _ctx._client = flight.recorder
+            try:
+                result = await coro(ctx, *args, **kwargs)
+            except BaseException as error:
+                flight.finish(error=error)
+                raise
+            else:
+                flight.finish(result)
+                return result
+            finally:
+                _ctx._client = http
+                del self.flights[key]
+
+        return wrapper
+
+    async def follow(self, ctx: CommandContext, flight: _Flight) -> Any:
+        """
+        Sends the responses of a running invocation to a context, until it finishes.
+
+        Parameters:
+
+        * `ctx: CommandContext`: The context of the waiting invocation.
+        * `flight`: The running invocation.
+        """
+        sent = 0
+        while True:
+            flight.changed.clear()
+            responses = flight.recorder.responses[sent:]
+            if responses:
+                await _replay(ctx, responses)
+                sent += len(responses)
+            elif flight.finished:
+                break
+            else:
+                await flight.changed.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        log.debug("Joined a running invocation, %d responses sent", sent)
+        return flight.result
+
+    def get_key(self, ctx: CommandContext) -> Hashable:
+        """
+        Returns the key of the invocation of a context.
+
+        Parameters:
+
+        * `ctx: CommandContext`: The context to get the key of.
+        """
+        return _get_key(self.key, ctx)
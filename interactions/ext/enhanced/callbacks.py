@@ -7,22 +7,280 @@ Content:
 * modal: modal callback
 * extension_component: extension component callback
 * extension_modal: extension modal callback
+* ModalFields: compiled extractor of modal text inputs
 
 GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/callbacks.py
 
 (c) 2022 interactions-py.
 """
+from collections import OrderedDict
+from dataclasses import MISSING as _MISSING
+from dataclasses import fields as dataclass_fields
+from dataclasses import is_dataclass
+from datetime import timedelta
+from functools import wraps
+from inspect import iscoroutinefunction
 from re import compile
-from typing import Awaitable, Callable, Optional, Union
-
-from interactions import Button, Client, Component, Modal, SelectMenu
+from time import monotonic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_type_hints,
+)
+
+from interactions.client.context import _Context
+
+from interactions import Button, Client, Component, Modal, SelectMenu, TextInput
 
 from ._logging import get_logger
+from .profiler import profiled
 
 log = get_logger("callback")
 Coroutine = Callable[..., Awaitable]
 
-__all__ = ("component", "modal", "extension_component", "extension_modal")
+__all__ = ("component", "modal", "extension_component", "extension_modal", "ModalFields")
+
+NoneType: Type[None] = type(None)
+_TRUE: frozenset = frozenset({"1", "true", "t", "yes", "y", "on"})
+_FALSE: frozenset = frozenset({"0", "false", "f", "no", "n", "off"})
+
+
+class _Coalescer:
+    """
+    Collapses identical component interactions into a single handler run.
+
+    Interactions are identical when their `(message_id, user_id, custom_id)` match. Duplicates
+    arriving inside the window are acknowledged with a deferred update instead of running the
+    handler again.
+    """
+
+    def __init__(self, window: Union[float, timedelta]):
+        self.window: float = window.total_seconds() if isinstance(window, timedelta) else window
+        if self.window <= 0:
+            raise ValueError("`coalesce` must be a positive amount of seconds!")
+        self.seen: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+
+    def __call__(self, coro: Coroutine) -> Coroutine:
+        @wraps(coro)
+        async def wrapper(*args, **kwargs):
+            ctx = args[0] if isinstance(args[0], _Context) else args[1]
+            key = (
+                str(ctx.message.id) if ctx.message else "",
+                str(ctx.user.id),
+                ctx.data.custom_id,
+            )
+            now = monotonic()
+            seen = self.seen
+
+            # every entry shares the same window, so insertion order is expiry order
+            while seen:
+                oldest, expires = next(iter(seen.items()))
+                if expires > now:
+                    break
+                del seen[oldest]
+
+            if key in seen:
+                log.debug("Coalesced duplicate interaction %s", key)
+                return await ctx.defer(edit_origin=True)
+
+            seen[key] = now + self.window
+            return await coro(*args, **kwargs)
+
+        return wrapper
+
+
+def _to_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"{value!r} is not a yes/no value")
+
+
+_CONVERTERS: Dict[type, Callable[[str], Any]] = {str: str, int: int, float: float, bool: _to_bool}
+
+
+class _Field(NamedTuple):
+    """A compiled text input of a `ModalFields`."""
+
+    name: str
+    label: str
+    required: bool
+    min_length: Optional[int]
+    max_length: Optional[int]
+    convert: Callable[[str], Any]
+
+
+class ModalFields:
+    """
+    The text inputs of a modal, compiled once into a flat extractor.
+
+    The submission is read in a single pass over the raw payload, then every field is checked
+    against the `required`, `min_length` and `max_length` of its `TextInput` and converted to
+    the type of the matching dataclass field, if `into` is given.
+
+    ```py
+    feedback = Modal("feedback", "Feedback", [
+        TextInput("name", "Name", max_length=32),
+        TextInput("age", "Age", required=False),
+    ])
+
+    @dataclass
+    class Feedback:
+        name: str
+        age: Optional[int] = None
+
+    @bot.modal(feedback, fields=feedback, into=Feedback)
+    async def on_feedback(ctx, fields: Feedback):
+        await ctx.send(f"Thanks {fields.name}!")
+    ```
+
+    Without `into`, the callback receives a `dict` of `custom_id` to value, with `None` for
+    optional fields that were left empty.
+
+    Parameters:
+
+    * `fields: Modal | TextInput | list[TextInput]`: The modal or text inputs to extract.
+    * `?into: type`: A dataclass to build from the fields. Its field names must be the `custom_id`s.
+    * `?error: Coroutine`: The function to call with `(ctx, error)` if the submission is invalid. Defaults to an ephemeral message.
+    """
+
+    def __init__(
+        self,
+        fields: Union[Modal, TextInput, List[TextInput]],
+        into: Optional[type] = None,
+        error: Optional[Coroutine] = None,
+    ):
+        inputs: List[TextInput] = (
+            fields.components
+            if isinstance(fields, Modal)
+            else [fields]
+            if isinstance(fields, TextInput)
+            else list(fields)
+        )
+        if into is not None and not is_dataclass(into):
+            raise TypeError("`into` must be a dataclass!")
+
+        hints: Dict[str, Any] = get_type_hints(into) if into is not None else {}
+        self.into: Optional[type] = into
+        self.error: Optional[Coroutine] = error
+        self.fields: Dict[str, _Field] = {}
+        for text_input in inputs:
+            custom_id = text_input.custom_id
+            self.fields[custom_id] = _Field(
+                custom_id,
+                text_input.label or custom_id,
+                text_input.required is not False,
+                text_input.min_length,
+                text_input.max_length,
+                self.__converter(hints.get(custom_id, str)),
+            )
+
+        if into is not None:
+            names = {f.name for f in dataclass_fields(into)}
+            required = {
+                f.name
+                for f in dataclass_fields(into)
+                if f.default is _MISSING and f.default_factory is _MISSING
+            }
+            if self.fields.keys() - names:
+                raise TypeError(f"`into` has no fields for {sorted(self.fields.keys() - names)}!")
+            if required - self.fields.keys():
+                raise TypeError(f"No text inputs for {sorted(required - self.fields.keys())}!")
+
+        self._empty: Dict[str, None] = {
+            name: None for name, field in self.fields.items() if not field.required
+        }
+
+    @staticmethod
+    def __converter(hint: Any) -> Callable[[str], Any]:
+        args = get_args(hint)
+        if NoneType in args and len(args) == 2:
+            hint = args[0] if args[1] is NoneType else args[1]
+        if hint not in _CONVERTERS:
+            raise TypeError(f"Unsupported modal field type: {hint}")
+        return _CONVERTERS[hint]
+
+    def extract(self, components: List[dict]) -> Union[Dict[str, Any], Any]:
+        """
+        Extracts the fields from the raw `components` of a modal submission.
+
+        Parameters:
+
+        * `components: list[dict]`: The action rows of the submission.
+
+        Returns:
+
+        `dict[str, Any] | into`
+
+        Raises:
+
+        `ValueError`: If a field is missing, has an invalid length, or cannot be converted.
+        """
+        fields = self.fields
+        values: Dict[str, Any] = dict(self._empty)
+        for row in components:
+            for text_input in row.get("components", ()):
+                field = fields.get(text_input.get("custom_id"))
+                if field is None:
+                    continue
+
+                value: str = text_input.get("value") or ""
+                if not value:
+                    if field.required:
+                        raise ValueError(f"{field.label} is required.")
+                    continue
+                if field.min_length is not None and len(value) < field.min_length:
+                    raise ValueError(
+                        f"{field.label} must be at least {field.min_length} characters."
+                    )
+                if field.max_length is not None and len(value) > field.max_length:
+                    raise ValueError(
+                        f"{field.label} must be at most {field.max_length} characters."
+                    )
+                try:
+                    values[field.name] = field.convert(value)
+                except ValueError:
+                    raise ValueError(f"{field.label} is not a valid value.") from None
+
+        if len(values) != len(fields):
+            missing = [field.label for name, field in fields.items() if name not in values]
+            raise ValueError(
+                f"{', '.join(missing)} {'is' if len(missing) == 1 else 'are'} required."
+            )
+
+        return self.into(**values) if self.into is not None else values
+
+    def __call__(self, coro: Coroutine) -> Coroutine:
+        @wraps(coro)
+        async def wrapper(*args, **kwargs):
+            index = 0 if isinstance(args[0], _Context) else 1
+            ctx = args[index]
+            try:
+                values = self.extract(ctx.data._json.get("components") or ())
+            except ValueError as error:
+                log.debug("Invalid modal submission: %s", error)
+                if not self.error:
+                    return await ctx.send(str(error), ephemeral=True)
+                return (
+                    await self.error(ctx, error)
+                    if iscoroutinefunction(self.error)
+                    else self.error(ctx, error)
+                )
+
+            return await coro(*args[: index + 1], values, **kwargs)
+
+        return wrapper
 
 
 def component(
@@ -30,6 +288,7 @@ def component(
     component: Union[str, Button, SelectMenu],
     startswith: bool = False,
     regex: bool = False,
+    coalesce: Optional[Union[float, timedelta]] = None,
 ) -> Callable[[Coroutine], Coroutine]:
     """
     A modified decorator that allows you to add more information to the `custom_id` and use
@@ -53,18 +312,26 @@ def component(
 
     The regex callback is called if the `custom_id` matches the given regex.
 
+    If `coalesce` is given, identical clicks (same message, user and `custom_id`) inside that
+    window only run the callback once, and the duplicates are acknowledged without a response.
+
     Parameters:
 
     * `(X)bot: Client`: The bot client.
     * `component: str | Button | SelectMenu`: The component custom_id or regex to listen to.
     * `?startswith: bool = False`: Whether the component custom_id starts with the given string.
     * `?regex: bool = False`: Whether the component custom_id matches the given regex.
+    * `?coalesce: float | timedelta`: The window, in seconds, to collapse duplicate clicks in.
     """
 
+    @profiled("component")
     def decorator(coro: Coroutine) -> Coroutine:
         if hasattr(coro, "__extension"):
             return bot.event(coro, name=f"component_{component}")
 
+        if coalesce is not None:
+            coro = _Coalescer(coalesce)(coro)
+
         payload: str = (
             Component(**component._json).custom_id
             if isinstance(component, (Button, SelectMenu))
@@ -89,7 +356,9 @@ def component(
         else:
             bot.event(coro, name=f"component_{payload}")
 
-        log.debug(f"Component callback, {startswith=}, {regex=}")
+        log.debug(
+            "Component callback, startswith=%r, regex=%r, coalesce=%r", startswith, regex, coalesce
+        )
         return coro
 
     return decorator
@@ -100,6 +369,8 @@ def modal(
     modal: Union[Modal, str],
     startswith: bool = False,
     regex: bool = False,
+    fields: Optional[Union[ModalFields, Modal, List[TextInput]]] = None,
+    into: Optional[type] = None,
 ) -> Callable[[Coroutine], Coroutine]:
     """
     A modified decorator that allows you to add more information to the `custom_id` and use
@@ -123,18 +394,27 @@ def modal(
 
     The regex callback is called if the `custom_id` matches the given regex.
 
+    If `fields` is given, the callback receives the submitted values as one argument after
+    `ctx`, extracted and validated by `ModalFields`.
+
     Parameters:
 
     * `(X)bot: Client`: The bot client.
     * `modal: str | Modal`: The modal custom_id or regex to listen to.
     * `?startswith: bool = False`: Whether the modal custom_id starts with the given string.
     * `?regex: bool`: Whether the modal custom_id matches the given regex.
+    * `?fields: ModalFields | Modal | list[TextInput]`: The text inputs to extract for the callback.
+    * `?into: type`: A dataclass to extract the fields into, instead of a `dict`.
     """
 
+    @profiled("modal")
     def decorator(coro: Coroutine) -> Coroutine:
         if hasattr(coro, "__extension"):
             return bot.event(coro, name=f"modal_{modal}")
 
+        if fields is not None:
+            coro = (fields if isinstance(fields, ModalFields) else ModalFields(fields, into))(coro)
+
         payload: str = modal.custom_id if isinstance(modal, Modal) else modal
         if startswith and regex:
             log.error("Cannot use both startswith and regex.")
@@ -155,7 +435,7 @@ def modal(
         else:
             bot.event(coro, name=f"modal_{payload}")
 
-        log.debug(f"Modal callback, {startswith=}, {regex=}")
+        log.debug("Modal callback, startswith=%r, regex=%r", startswith, regex)
         return coro
 
     return decorator
@@ -165,6 +445,7 @@ def extension_component(
     component: Union[str, Button, SelectMenu],
     startswith: Optional[bool] = False,
     regex: Optional[bool] = False,
+    coalesce: Optional[Union[float, timedelta]] = None,
 ):
     """
     A modified decorator that allows you to add more information to the `custom_id` and use
@@ -194,13 +475,18 @@ def extension_component(
     * `component: str | Button | SelectMenu`: The component custom_id or regex to listen to.
     * `?startswith: bool = False`: Whether the component custom_id starts with the given string.
     * `?regex: bool = False`: Whether the component custom_id matches the given regex.
+    * `?coalesce: float | timedelta`: The window, in seconds, to collapse duplicate clicks in.
     """
 
+    @profiled("extension_component")
     def decorator(func):
         if startswith and regex:
             log.error("Cannot use both startswith and regex.")
             raise ValueError("Cannot use both startswith and regex!")
 
+        if coalesce is not None:
+            func = _Coalescer(coalesce)(func)
+
         func.__extension = True
         payload: str = (
             Component(**component._json).custom_id
@@ -221,7 +507,12 @@ def extension_component(
                 func.__func__.regex = compile(payload)
             payload = f"regex_{payload}"
 
-        log.debug(f"Extension component callback, {startswith=}, {regex=}")
+        log.debug(
+            "Extension component callback, startswith=%r, regex=%r, coalesce=%r",
+            startswith,
+            regex,
+            coalesce,
+        )
 
         func.__component_data__ = (
             (),
@@ -236,6 +527,8 @@ def extension_modal(
     modal: Union[Modal, str],
     startswith: bool = False,
     regex: bool = False,
+    fields: Optional[Union[ModalFields, Modal, List[TextInput]]] = None,
+    into: Optional[type] = None,
 ):
     """
     A modified decorator that allows you to add more information to the `custom_id` and use
@@ -265,13 +558,19 @@ def extension_modal(
     * `modal: str | Modal`: The modal custom_id or regex to listen to.
     * `?startswith: bool = False`: Whether the modal custom_id starts with the given string.
     * `?regex: bool` = False: Whether the modal custom_id matches the given regex.
+    * `?fields: ModalFields | Modal | list[TextInput]`: The text inputs to extract for the callback.
+    * `?into: type`: A dataclass to extract the fields into, instead of a `dict`.
     """
 
+    @profiled("extension_modal")
     def decorator(func):
         if startswith and regex:
             log.error("Cannot use both startswith and regex.")
             raise ValueError("Cannot use both startswith and regex!")
 
+        if fields is not None:
+            func = (fields if isinstance(fields, ModalFields) else ModalFields(fields, into))(func)
+
         func.__extension = True
         payload: str = modal.custom_id if isinstance(modal, Modal) else modal
 
@@ -288,7 +587,7 @@ def extension_modal(
                 func.__func__.regex = compile(payload)
             payload = f"regex_{payload}"
 
-        log.debug(f"Extension modal callback, {startswith=}, {regex=}")
+        log.debug("Extension modal callback, startswith=%r, regex=%r", startswith, regex)
 
         func.__modal_data__ = (
             (),
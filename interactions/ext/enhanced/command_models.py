@@ -16,6 +16,8 @@ from typing import TYPE_CHECKING, Awaitable, Callable, List, Optional, Type, Uni
 from interactions import MISSING, Attachment, Channel, File, Member, Option, OptionType, Role, User
 
 from ._logging import get_logger
+from .autocomplete import AutocompleteHandler, AutocompleteIndex
+from .profiler import profiled
 
 if TYPE_CHECKING:
     from types import MappingProxyType
@@ -100,6 +102,7 @@ class EnhancedOption:
     * `?option_type: type | int | OptionType`: The type of the option.
     * `?description: str = "No description"`: The description of the option.
     * `?name: str`: The name of the option. Defaults to the argument name.
+    * `?autocomplete_source: Iterable | Callable | AutocompleteIndex | AutocompleteHandler`: Choices the extension autocompletes the option with by itself, see `AutocompleteIndex` and `AutocompleteHandler`.
     * `?**kwargs`: Any additional keyword arguments, same as `ipy.Option`.
     """
 
@@ -138,6 +141,14 @@ class EnhancedOption:
 
         self.description = description or "No description"
         self.name = name
+        self.autocomplete_source: Optional[Union[AutocompleteIndex, AutocompleteHandler]] = None
+        if (source := kwargs.pop("autocomplete_source", None)) is not None:
+            self.autocomplete_source = (
+                source
+                if isinstance(source, (AutocompleteIndex, AutocompleteHandler))
+                else AutocompleteIndex(source)
+            )
+            kwargs["autocomplete"] = True
         self.kwargs = kwargs
 
     def __repr__(self):
@@ -164,6 +175,7 @@ def format_parameters(coro: Callable[..., Awaitable]):
         return loop_params(_params, 0)
 
 
+@profiled("parameters_to_options")
 def parameters_to_options(
     coro: Callable[..., Awaitable], has_res: bool = False
 ) -> Optional[List[Option]]:
@@ -200,6 +212,6 @@ def parameters_to_options(
         raise TypeError(
             "You must typehint with `EnhancedOption` or specify `options=...` in the decorator!"
         )
-    log.debug(f"  _options: {_options}\n")
+    log.debug("  _options: %s\n", _options)
 
     return _options
@@ -4,26 +4,36 @@ commands
 Content:
 
 * setup_options: Sets up the options of the command.
+* compile_converter: Compiles the converter of the command's options.
+* materialize_options: Builds the options of lazily set up commands.
 
 GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/commands.py
 
 (c) 2022 interactions-py.
 """
-from inspect import signature
+from functools import wraps
+from inspect import signature, unwrap
 from logging import Logger
-from typing import Awaitable, Callable
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
 
 from typing_extensions import _AnnotatedAlias
 
+from interactions import Member, Option, OptionType, User
+
 from ._logging import get_logger
 from .command_models import EnhancedOption, parameters_to_options
+from .profiler import _describe, profiled
+from .schema_cache import active_schema_cache, fingerprint
 
-__all__ = ("setup_options",)
+__all__ = ("setup_options", "compile_converter", "materialize_options")
 
 log: Logger = get_logger("command")
 
 
-def setup_options(coro: Callable[..., Awaitable]):
+@profiled("setup_options")
+def setup_options(
+    coro: Callable[..., Awaitable] = None, *, convert: bool = False, lazy: bool = False
+):
     """
     Sets up the options of the command.
 
@@ -35,10 +45,242 @@ def setup_options(coro: Callable[..., Awaitable]):
         ...
     ```
 
+    With `convert=True`, the command is wrapped by a converter compiled from its options, which
+    passes options to their argument even if renamed, turns numbers into `float`s and members into
+    users where the annotation asks for it, and checks `min_value`, `max_value`, `min_length` and
+    `max_length`:
+
+    ```py
+    @bot.command()
+    @setup_options(convert=True)
+    async def test(ctx, amount: Annotated[float, EnhancedOption(min_value=0, name="value")]):
+        ...
+    ```
+
+    With `lazy=True`, nothing is built when the command is defined. The options are built when
+    `Enhanced` resolves the commands before syncing them, when the command is first called with
+    `convert=True`, or when `materialize_options` is called, whichever comes first.
+
     Parameters:
 
     * `(X)coro: Callable[..., Awaitable]`: The coroutine to setup the options of.
+    * `?convert: bool = False`: Whether to convert the options when the command is called.
+    * `?lazy: bool = False`: Whether to build the options only when they are needed.
+    """
+    if coro is None:
+        return lambda coro: setup_options(coro, convert=convert, lazy=lazy)
+
+    if lazy:
+        return _LazyOptions(coro, convert).target
+
+    return _apply_options(coro, coro, _resolve_options(coro), convert)
+
+
+def _resolve_options(coro: Callable[..., Awaitable]) -> Optional[List[Option]]:
+    """Builds the options of a command, through the schema cache if it is enabled."""
+    cache = active_schema_cache()
+    if cache is None:
+        return _build_options(coro)
+
+    digest = fingerprint(coro)
+    options = cache.get(coro, digest)
+    if options is False:
+        options = _build_options(coro)
+        cache.put(coro, digest, options)
+    return options
+
+
+def _apply_options(
+    target: Callable[..., Awaitable],
+    coro: Callable[..., Awaitable],
+    options: Optional[List[Option]],
+    convert: bool,
+) -> Callable[..., Awaitable]:
+    """Gives `target` the options built from `coro`, returning the command to register."""
+    if options is None:
+        return target
+
+    sources = {}
+    for (_, annotation), option in zip(_option_params(coro, options), options):
+        enhanced = (
+            annotation if isinstance(annotation, EnhancedOption) else annotation.__metadata__[0]
+        )
+        if getattr(enhanced, "autocomplete_source", None) is not None:
+            sources[option.name] = enhanced.autocomplete_source
+
+    if convert and target is coro:
+        target = compile_converter(coro, options)
+    if sources:
+        target._autocomplete_sources = sources
+
+    if hasattr(target, "_options") and isinstance(target._options, list):
+        target._options.extend(options)
+    else:
+        target._options = options
+
+    return target
+
+
+_pending: List["_LazyOptions"] = []
+
+
+class _LazyOptions:
+    """The options of a command set up with `setup_options(lazy=True)`, not built yet."""
+
+    __slots__ = ("coro", "convert", "target", "call")
+
+    def __init__(self, coro: Callable[..., Awaitable], convert: bool):
+        self.coro = coro
+        self.convert = convert
+        self.call: Optional[Callable[..., Awaitable]] = None
+
+        if convert:  # the converter is only known once the options are
+
+            @wraps(coro)
+            async def target(*args, **kwargs):
+                if self.call is None:
+                    self.materialize()
+                return await self.call(*args, **kwargs)
+
+        else:
+            target = coro
+
+        if not isinstance(getattr(target, "_options", None), list):
+            target._options = []
+        target._lazy_options = self
+        self.target = target
+        _pending.append(self)
+
+    @profiled("materialize_options", lambda self: _describe(self.coro))
+    def materialize(self) -> None:
+        if self.call is not None:
+            return
+        options = _resolve_options(self.coro)
+        _apply_options(self.target, self.coro, options, False)
+        self.call = (
+            compile_converter(self.coro, options)
+            if self.convert and options is not None
+            else self.coro
+        )
+        if self in _pending:
+            _pending.remove(self)
+        log.debug("Materialized the options of %s", self.coro.__qualname__)
+
+
+def _release_pending(module: str) -> None:
+    """Forgets the lazy options of the commands of an unloaded module."""
+    _pending[:] = [lazy for lazy in _pending if getattr(lazy.coro, "__module__", None) != module]
+
+
+def materialize_options(coro: Callable[..., Awaitable] = None) -> List[Callable[..., Awaitable]]:
     """
+    Builds the options of commands set up with `setup_options(lazy=True)`.
+
+    `Enhanced` calls this before the client resolves its commands, so it is only needed without
+    it, or to build the options of a command early.
+
+    Parameters:
+
+    * `?coro: Callable[..., Awaitable]`: The command. Defaults to every pending command.
+
+    Returns:
+
+    `list[Callable[..., Awaitable]]`: The commands whose options were built.
+    """
+    if coro is not None:
+        record = getattr(coro, "_lazy_options", None)
+        lazy = [record] if record is not None else []
+    else:
+        lazy = list(_pending)
+    built = [record.target for record in lazy if record.call is None]
+    for record in lazy:
+        record.materialize()
+    return built
+
+
+def _to_user(value):
+    """Gets the user of a member."""
+    return value.user if isinstance(value, Member) and value.user is not None else value
+
+
+def _bounds(name: str, low, high, measure: Callable = None) -> Callable[[Any], None]:
+    """Creates a check that a value, or its `measure`, is within bounds."""
+    what = "The length of " if measure is len else ""
+
+    def check(value):
+        size = measure(value) if measure else value
+        if low is not None and size < low:
+            raise ValueError(f"{what}`{name}` must be at least {low}, not {size}!")
+        if high is not None and size > high:
+            raise ValueError(f"{what}`{name}` must be at most {high}, not {size}!")
+
+    return check
+
+
+def _option_params(coro: Callable[..., Awaitable], options: List[Option]) -> List[Tuple[str, Any]]:
+    """Returns the argument name and annotation each of the command's options was built from."""
+    return [
+        (name, annotation)
+        for name, annotation in unwrap(coro).__annotations__.items()
+        if isinstance(annotation, (EnhancedOption, _AnnotatedAlias))
+    ][-len(options) :]
+
+
+def compile_converter(
+    coro: Callable[..., Awaitable], options: List[Option]
+) -> Callable[..., Awaitable]:
+    """
+    Compiles the converter of a command's options, and wraps the command with it.
+
+    Everything is looked up once here, so a call only runs the steps its options need. Options
+    resolved by interactions.py, such as channels and roles, are passed as they are.
+
+    Parameters:
+
+    * `coro: Callable[..., Awaitable]`: The command.
+    * `options: list[Option]`: The options built from its annotations, by `setup_options`.
+
+    Returns:
+
+    `Callable[..., Awaitable]`: The wrapped command, or `coro` if nothing needs converting.
+    """
+    steps: List[Tuple[str, str, Optional[Callable], Tuple[Callable, ...]]] = []
+    for (param, annotation), option in zip(_option_params(coro, options), options):
+        cast = float if option.type == OptionType.NUMBER else None  # Discord may send an int
+        if option.type == OptionType.USER and getattr(annotation, "__origin__", None) is User:
+            cast = _to_user
+        checks = []
+        if option.min_value is not None or option.max_value is not None:
+            checks.append(_bounds(option.name, option.min_value, option.max_value))
+        if option.min_length is not None or option.max_length is not None:
+            checks.append(_bounds(option.name, option.min_length, option.max_length, len))
+        name = option.converter or option.name
+        if name != param or cast is not None or checks:
+            steps.append((name, param, cast, tuple(checks)))
+
+    if not steps:
+        return coro
+
+    log.debug("Compiled converter of %s: %s", coro.__qualname__, steps)
+
+    @wraps(coro)
+    async def wrapper(*args, **kwargs):
+        for name, param, cast, checks in steps:
+            if name not in kwargs:
+                continue
+            value = kwargs.pop(name)
+            if cast is not None:
+                value = cast(value)
+            for check in checks:
+                check(value)
+            kwargs[param] = value
+        return await coro(*args, **kwargs)
+
+    return wrapper
+
+
+def _build_options(coro: Callable[..., Awaitable]) -> Optional[List[Option]]:
+    """Builds the options of a command, or returns `None` if it has none to set up."""
     params = signature(coro).parameters
 
     def check(num: int):
@@ -49,13 +291,6 @@ def setup_options(coro: Callable[..., Awaitable]):
         )
 
     if not (check(1) or check(2)):
-        return coro
-
-    options = parameters_to_options(coro)
-
-    if hasattr(coro, "_options") and isinstance(coro._options, list):
-        coro._options.extend(options)
-    else:
-        coro._options = options
+        return None
 
-    return coro
+    return parameters_to_options(coro)
@@ -10,16 +10,26 @@ Content:
 * TextInput: enhanced text input
 * Modal: enhanced modal
 * spread_to_rows: spread components to rows
+* freeze: validate and serialize a component tree once
+* ComponentTemplate: frozen, pre-serialized component tree
+* component_hash: structural hash of a component tree
+* diff_components: compare two component trees
+* ComponentDiff: differences between two component trees
+* edit_components: edit components only if they changed
 
 GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/components.py
 
 (c) 2022 interactions-py.
 """
-from typing import List, Optional, Union
+from copy import deepcopy
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
+from interactions.client.models.component import _build_components
+
+from interactions import MISSING
 from interactions import ActionRow as AR
 from interactions import Button as B
-from interactions import ButtonStyle, Emoji
+from interactions import ButtonStyle, CommandContext, ComponentContext, Emoji, Message
 from interactions import Modal as M
 from interactions import SelectMenu as SM
 from interactions import SelectOption as SO
@@ -35,6 +45,12 @@ __all__ = (
     "SelectMenu",
     "TextInput",
     "Modal",
+    "freeze",
+    "ComponentTemplate",
+    "component_hash",
+    "diff_components",
+    "ComponentDiff",
+    "edit_components",
 )
 
 log = get_logger("components")
@@ -64,7 +80,7 @@ def ActionRow(*args: Union[B, SM, TI]) -> AR:
 
     `ActionRow`
     """
-    log.debug(f"Creating ActionRow with {list(args)}")
+    log.debug("Creating ActionRow with %s", args)
     return AR(components=list(args))
 
 
@@ -108,7 +124,13 @@ def Button(
     `Button`
     """
     log.debug(
-        f"Creating Button with {style=}, {label=}, {custom_id=}, {url=}, {emoji=}, {disabled=}"
+        "Creating Button with style=%r, label=%r, custom_id=%r, url=%r, emoji=%r, disabled=%r",
+        style,
+        label,
+        custom_id,
+        url,
+        emoji,
+        disabled,
     )
     if custom_id and url:
         raise ValueError("`custom_id` and `url` cannot be used together!")
@@ -174,7 +196,12 @@ def SelectOption(
     `SelectOption`
     """
     log.debug(
-        f"Creating SelectOption with {label=}, {value=}, {description=}, {emoji=}, {disabled=}"
+        "Creating SelectOption with label=%r, value=%r, description=%r, emoji=%r, disabled=%r",
+        label,
+        value,
+        description,
+        emoji,
+        disabled,
     )
     return SO(
         label=label,
@@ -226,7 +253,14 @@ def SelectMenu(
     `SelectMenu`
     """
     log.debug(
-        f"Creating SelectMenu with {custom_id=}, {options=}, {placeholder=}, {min_values=}, {max_values=}, {disabled=}"
+        "Creating SelectMenu with custom_id=%r, options=%r, placeholder=%r, min_values=%r, "
+        "max_values=%r, disabled=%r",
+        custom_id,
+        options,
+        placeholder,
+        min_values,
+        max_values,
+        disabled,
     )
     return SM(
         custom_id=custom_id,
@@ -281,7 +315,16 @@ def TextInput(
     `TextInput`
     """
     log.debug(
-        f"Creating TextInput with {custom_id=}, {label=}, {style=}, {value=}, {required=}, {placeholder=}, {min_length=}, {max_length=}"
+        "Creating TextInput with custom_id=%r, label=%r, style=%r, value=%r, required=%r, "
+        "placeholder=%r, min_length=%r, max_length=%r",
+        custom_id,
+        label,
+        style,
+        value,
+        required,
+        placeholder,
+        min_length,
+        max_length,
     )
     return TI(
         custom_id=custom_id,
@@ -323,5 +366,289 @@ def Modal(custom_id: str, title: str, components: List[TI], **kwargs) -> M:
 
     `Modal`
     """
-    log.debug(f"Creating Modal with {custom_id=}, {title=}, {components=}")
+    log.debug(
+        "Creating Modal with custom_id=%r, title=%r, components=%r", custom_id, title, components
+    )
     return M(custom_id=custom_id, title=title, components=components, **kwargs)
+
+
+class FrozenComponent:
+    """
+    A serialized component, sendable wherever interactions.py accepts components.
+
+    Parameters:
+
+    * `_json: dict`: The serialized component.
+    """
+
+    __slots__ = ("_json", "_hash")
+
+    def __init__(self, _json: dict):
+        self._json = _json
+        self._hash: Optional[int] = None
+
+    @property
+    def custom_id(self) -> Optional[str]:
+        return self._json.get("custom_id")
+
+    def __repr__(self):
+        return f"<FrozenComponent {self._json}>"
+
+
+class ComponentTemplate:
+    """
+    A component tree that was validated and serialized once, created by `freeze`.
+
+    Rendering without overrides returns the same ready rows every time. Overrides copy only the
+    components they change, and everything else stays shared.
+
+    Parameters:
+
+    * `rows: list[dict]`: The serialized action rows.
+    """
+
+    __slots__ = ("rows", "_rendered")
+
+    def __init__(self, rows: List[dict]):
+        self.rows: List[dict] = rows
+        self._rendered: List[List[FrozenComponent]] = [
+            [FrozenComponent(component) for component in row["components"]] for row in rows
+        ]
+
+    @property
+    def payload(self) -> List[dict]:
+        """The serialized action rows, as sent to Discord. Do not modify it."""
+        return self.rows
+
+    def render(
+        self,
+        *,
+        disabled: Optional[bool] = None,
+        suffix: str = "",
+        overrides: Optional[Dict[str, dict]] = None,
+    ) -> List[List[FrozenComponent]]:
+        """
+        Renders the template for `ctx.send(components=...)` or `ctx.edit(components=...)`.
+
+        ```py
+        panel = freeze(ActionRow(Button(1, "Yes", custom_id="yes"), Button(4, "No", custom_id="no")))
+
+        await ctx.send("Sure?", components=panel.render(suffix=f":{ctx.author.id}"))
+        await ctx.edit(components=panel.render(disabled=True))
+        await ctx.edit(components=panel.render(overrides={"no": {"label": "Nope"}}))
+        ```
+
+        Parameters:
+
+        * `?disabled: bool`: Whether every component is disabled. Defaults to the frozen state.
+        * `?suffix: str`: A suffix to add to every `custom_id`.
+        * `?overrides: dict[str, dict]`: Fields to change, keyed by the frozen `custom_id` of the component.
+
+        Returns:
+
+        `list[list[FrozenComponent]]`
+        """
+        if disabled is None and not suffix and not overrides:
+            return self._rendered
+
+        rendered = []
+        for row in self._rendered:
+            new_row = []
+            for frozen in row:
+                _json = frozen._json
+                changes = overrides.get(_json.get("custom_id")) if overrides else None
+                if disabled is not None and _json.get("disabled", False) != disabled:
+                    changes = {"disabled": disabled, **(changes or {})}
+                if suffix and _json.get("custom_id"):
+                    changes = {"custom_id": _json["custom_id"] + suffix, **(changes or {})}
+                new_row.append(FrozenComponent({**_json, **changes}) if changes else frozen)
+            rendered.append(new_row)
+        return rendered
+
+    def __repr__(self):
+        return f"<ComponentTemplate rows={len(self.rows)}>"
+
+
+def freeze(*components: Union[AR, B, SM, List[Union[AR, B, SM]]]) -> ComponentTemplate:
+    """
+    Validates and serializes a component tree once, so it can be sent repeatedly for free.
+
+    ```py
+    PANEL = freeze(
+        ActionRow(Button(1, "Refresh", custom_id="refresh"), Button(4, "Close", custom_id="close")),
+        ActionRow(SelectMenu("sort", [SelectOption("New", "new"), SelectOption("Top", "top")])),
+    )
+
+    @bot.command()
+    async def panel(ctx):
+        await ctx.send("Panel", components=PANEL.render())
+    ```
+
+    Parameters:
+
+    * `*components: ActionRow | Button | SelectMenu | list[...]`: The components, in any shape `ctx.send` accepts.
+
+    Returns:
+
+    `ComponentTemplate`
+    """
+    tree = components[0] if len(components) == 1 else list(components)
+    log.debug("Freezing %s", tree)
+    return ComponentTemplate(deepcopy(_build_components(components=tree)))
+
+
+# fields Discord may return as `false` for components that were sent without them
+_FALSE_DEFAULTS = frozenset({"disabled", "animated", "default"})
+_Tree = List[List[Union[dict, FrozenComponent, B, SM]]]
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(
+            sorted(
+                (key, _canonical(item))
+                for key, item in value.items()
+                if item is not None and not (item is False and key in _FALSE_DEFAULTS)
+            )
+        )
+    if isinstance(value, list):
+        return tuple(_canonical(item) for item in value)
+    return value
+
+
+def _fields(component: Union[dict, FrozenComponent, B, SM]) -> dict:
+    return component if isinstance(component, dict) else component._json
+
+
+def _hash(component: Union[dict, FrozenComponent, B, SM]) -> int:
+    if isinstance(component, FrozenComponent):  # frozen, so hashed once
+        if component._hash is None:
+            component._hash = hash(_canonical(component._json))
+        return component._hash
+    return hash(_canonical(_fields(component)))
+
+
+def _tree(components) -> _Tree:
+    """The components of every row, keeping rendered `FrozenComponent`s as they are."""
+    if isinstance(components, ComponentTemplate):
+        return components._rendered
+    if not components:
+        return []
+    if isinstance(components, list) and all(isinstance(row, list) for row in components):
+        return components
+    if isinstance(components, list) and all(isinstance(row, dict) for row in components):
+        return [row["components"] for row in components]  # a payload
+    return [row["components"] for row in _build_components(components=components)]
+
+
+def component_hash(components) -> int:
+    """
+    Returns a structural hash of a component tree.
+
+    Trees that serialize to the same payload have the same hash, whatever their shape: models,
+    rendered templates or payloads. Rendered `FrozenComponent`s are only hashed once.
+
+    Parameters:
+
+    * `components: ActionRow | Button | SelectMenu | ComponentTemplate | list[...]`: The components, in any shape `ctx.edit` accepts.
+
+    Returns:
+
+    `int`
+    """
+    return hash(tuple(tuple(_hash(component) for component in row) for row in _tree(components)))
+
+
+class ComponentDiff(NamedTuple):
+    """
+    The differences between two component trees, returned by `diff_components`.
+
+    Parameters:
+
+    * `same: bool`: Whether the trees are the same, so editing one into the other changes nothing.
+    * `changes: dict[tuple[int, int], dict]`: The fields that changed, by the row and position of the component. Removed fields are `None`.
+    * `reshaped: bool`: Whether rows or components were added or removed, which `changes` does not cover.
+    """
+
+    same: bool
+    changes: Dict[Tuple[int, int], Dict[str, Any]]
+    reshaped: bool
+
+
+def diff_components(old, new) -> ComponentDiff:
+    """
+    Compares two component trees, component by component.
+
+    ```py
+    diff = diff_components(ctx.message.components, panel.render(overrides={"next": {"disabled": True}}))
+    diff.changes  # {(0, 1): {"disabled": True}}
+    ```
+
+    Parameters:
+
+    * `old: ActionRow | Button | SelectMenu | ComponentTemplate | list[...]`: The current components.
+    * `new: ActionRow | Button | SelectMenu | ComponentTemplate | list[...]`: The components to compare them to.
+
+    Returns:
+
+    `ComponentDiff`
+    """
+    old_tree, new_tree = _tree(old), _tree(new)
+    if old_tree is new_tree:
+        return ComponentDiff(True, {}, False)
+
+    reshaped = [len(row) for row in old_tree] != [len(row) for row in new_tree]
+    changes: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for y, (old_row, new_row) in enumerate(zip(old_tree, new_tree)):
+        for x, (before, after) in enumerate(zip(old_row, new_row)):
+            if before is after or _hash(before) == _hash(after):
+                continue
+            before, after = _fields(before), _fields(after)
+            changes[y, x] = {
+                key: after.get(key)
+                for key in before.keys() | after.keys()
+                if _canonical(before.get(key)) != _canonical(after.get(key))
+            }
+    return ComponentDiff(not reshaped and not changes, changes, reshaped)
+
+
+async def edit_components(
+    ctx: Union[CommandContext, ComponentContext], components, *, previous=MISSING, **kwargs
+) -> Optional[Message]:
+    """
+    Edits the message of a context, only if its components or anything else changed.
+
+    ```py
+    @bot.component("next")
+    async def next_page(ctx):
+        await edit_components(ctx, panel.render(overrides=state_of(ctx)))
+    ```
+
+    If nothing changed, no edit is sent. A component interaction that was not responded to yet is
+    still acknowledged, with a deferred update of its message that changes nothing.
+
+    Parameters:
+
+    * `ctx: CommandContext | ComponentContext`: The context of the message.
+    * `components: ActionRow | Button | SelectMenu | ComponentTemplate | list[...]`: The new components.
+    * `?previous: ActionRow | Button | SelectMenu | ComponentTemplate | list[...]`: The current components. Defaults to those of `ctx.message`.
+    * `?**kwargs`: Anything else to edit, as in `ctx.edit`.
+
+    Returns:
+
+    `Message | None`: The edited message, or `None` if nothing changed.
+    """
+    if previous is MISSING:
+        previous = ctx.message.components if ctx.message else None
+    diff = diff_components(previous, components)
+    if diff.same and not kwargs:
+        if isinstance(ctx, ComponentContext) and not ctx.responded:
+            await ctx.defer(edit_origin=True)
+        log.debug("Skipped an edit that changed nothing")
+        return None
+
+    if isinstance(components, ComponentTemplate):
+        components = components.render()
+    if diff.same:  # the current components are sent again by `ctx.edit`
+        return await ctx.edit(**kwargs)
+    return await ctx.edit(components=components, **kwargs)
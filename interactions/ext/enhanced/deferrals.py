@@ -0,0 +1,164 @@
+"""
+deferrals
+
+Content:
+
+* auto_defer: latency budget decorator
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/deferrals.py
+
+(c) 2022 interactions-py.
+"""
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from interactions.client.context import _Context
+
+from interactions import Command, CommandContext, ComponentContext, Extension
+from interactions import InteractionCallbackType as Callback
+
+from ._logging import get_logger
+
+__all__ = ("auto_defer",)
+
+log = get_logger("enhanced.deferrals")
+Coroutine = Callable[..., Awaitable]
+
+
+class _Deferrer:
+    """
+    Stands in for the HTTP client of a context, deferring it once the budget is spent.
+
+    A response the handler was already sending when the deferral went out is routed to the
+    endpoint that completes a deferred interaction instead.
+    """
+
+    __slots__ = ("_http", "application_id", "lock", "responded", "deferred")
+
+    def __init__(self, http, application_id: str):
+        self._http = http
+        self.application_id: str = application_id
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.responded: bool = False
+        self.deferred: Optional[int] = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._http, name)
+
+    async def defer(self, ctx: _Context, ephemeral: bool, edit_origin: bool) -> None:
+        async with self.lock:
+            if ctx.responded or self.responded:
+                return
+            callback = (
+                Callback.DEFERRED_UPDATE_MESSAGE
+                if edit_origin and isinstance(ctx, ComponentContext)
+                else Callback.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE
+            )
+            await self._http.create_interaction_response(
+                token=ctx.token,
+                application_id=int(ctx.id),
+                data={"type": callback.value, "data": {"flags": 1 << 6 if ephemeral else 0}},
+            )
+            # set once sent, so a response started meanwhile waits for the lock instead
+            ctx.callback = callback
+            ctx.deferred = True
+            ctx.responded = self.responded = True
+            self.deferred = callback.value
+        log.debug("Deferred an interaction that exceeded its latency budget")
+
+    async def create_interaction_response(self, token: str, application_id: int, data: dict):
+        async with self.lock:
+            if self.deferred is None:
+                self.responded = True
+                return await self._http.create_interaction_response(token, application_id, data)
+
+        kind = data.get("type")
+        if kind in {
+            Callback.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE,
+            Callback.DEFERRED_UPDATE_MESSAGE,
+        }:
+            return  # already deferred
+        if kind == Callback.CHANNEL_MESSAGE_WITH_SOURCE and self.deferred == (
+            Callback.DEFERRED_UPDATE_MESSAGE
+        ):
+            return await self._http._post_followup(data["data"], token, self.application_id)
+        if kind in {Callback.CHANNEL_MESSAGE_WITH_SOURCE, Callback.UPDATE_MESSAGE}:
+            return await self._http.edit_interaction_response(
+                data["data"], token, self.application_id
+            )
+        return await self._http.create_interaction_response(token, application_id, data)
+
+
+class auto_defer:
+    """
+    A decorator for deferring an interaction only when its handler is slow to respond.
+
+    ```py
+    from interactions.ext.enhanced import auto_defer
+
+    @client.command(...)
+    @auto_defer(after_ms=1500)
+    async def report(ctx, ...):
+        ...  # usually fast, sometimes not
+        await ctx.send(...)
+    ```
+
+    If the handler has not responded `after_ms` milliseconds after it started, the interaction
+    is deferred. Later responses then complete the deferred interaction, as if the handler had
+    called `ctx.defer()` itself. Modals can only be sent before the interaction is deferred.
+
+    Parameters:
+
+    * `?after_ms: float = 2000`: The milliseconds to wait for a response before deferring.
+    * `?ephemeral: bool = False`: Whether the deferred response is ephemeral.
+    * `?edit_origin: bool = False`: Whether a component interaction is deferred as an update of its message, instead of as a new message.
+    """
+
+    def __init__(
+        self, after_ms: float = 2000, *, ephemeral: bool = False, edit_origin: bool = False
+    ):
+        if after_ms < 0:
+            raise ValueError("`after_ms` must not be negative!")
+
+        self.after: float = after_ms / 1000
+        self.ephemeral: bool = ephemeral
+        self.edit_origin: bool = edit_origin
+        self.deferred: int = 0
+
+    def __call__(self, coro: Coroutine) -> Coroutine:
+        if isinstance(coro, Command):
+            raise SyntaxError("Automatic deferrals must go below command decorators!")
+
+        coro.auto_defer = self
+
+        @wraps(coro)
+        async def wrapper(ctx: Union[CommandContext, ComponentContext, Extension], *args, **kwargs):
+            _ctx: _Context = ctx if isinstance(ctx, _Context) else args[0]
+            if _ctx.responded:
+                return await coro(ctx, *args, **kwargs)
+
+            http = _ctx._client
+            deferrer = _Deferrer(http, str(_ctx.application_id))
+            deferral: Optional[asyncio.Task] = None
+
+            def expire():
+                nonlocal deferral
+                if not _ctx.responded:
+                    deferral = asyncio.create_task(
+                        deferrer.defer(_ctx, self.ephemeral, self.edit_origin)
+                    )
+
+            _ctx._client = deferrer
+            timer = asyncio.get_running_loop().call_later(self.after, expire)
+            try:
+                return await coro(ctx, *args, **kwargs)
+            finally:
+                timer.cancel()
+                _ctx._client = http
+                if deferral is not None:
+                    await deferral
+                    if deferrer.deferred is not None:
+                        self.deferred += 1
+
+        return wrapper
@@ -0,0 +1,229 @@
+"""
+executors
+
+Content:
+
+* offload: executor offloading decorator
+* warm_executor: starts the workers of a shared executor
+* shutdown_executors: stops the shared executors
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/executors.py
+
+(c) 2022 interactions-py.
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, wraps
+from importlib import import_module
+from inspect import Parameter, iscoroutinefunction, signature
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from interactions.client.context import _Context
+
+from interactions import Command, CommandContext
+
+from ._logging import get_logger
+from .deferrals import auto_defer
+
+__all__ = ("offload", "warm_executor", "shutdown_executors")
+
+log = get_logger("enhanced.executors")
+Coroutine = Callable[..., Awaitable]
+
+_executors: Dict[str, Executor] = {}
+_functions: Dict[str, Callable] = {}
+
+
+def _executor(kind: str, workers: Optional[int] = None) -> Executor:
+    executor = _executors.get(kind)
+    if executor is None:
+        if kind == "process":
+            executor = ProcessPoolExecutor(max_workers=workers)
+        elif kind == "thread":
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enhanced")
+        else:
+            raise ValueError(f"Invalid executor {kind!r}! Must be 'process' or 'thread'!")
+        _executors[kind] = executor
+    return executor
+
+
+def _call(key: str, args: tuple, kwargs: dict) -> Any:
+    """Runs an offloaded function in a worker, by its registered key."""
+    func = _functions.get(key)
+    if func is None:  # a spawned worker, which did not inherit the registry
+        import_module(key.split(":", 1)[0])
+        func = _functions[key]
+    return func(*args, **kwargs)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _portable(value: Any) -> Any:
+    """Converts models to their JSON, so they can be sent to a process."""
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(_portable(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _portable(item) for key, item in value.items()}
+    json = getattr(value, "_json", None)
+    return json if isinstance(json, dict) else value
+
+
+async def _respond(ctx: CommandContext, result: Any) -> None:
+    if result is None:
+        return
+    if isinstance(result, dict):
+        await ctx.send(**result)
+    else:
+        await ctx.send(result if isinstance(result, str) else str(result))
+
+
+def warm_executor(kind: str = "process", workers: Optional[int] = None) -> Executor:
+    """
+    Starts every worker of a shared executor, so the first offloaded commands do not wait for
+    them.
+
+    Call it before starting the bot, so processes are not forked from a running event loop:
+
+    ```py
+    from interactions.ext.enhanced import warm_executor
+
+    warm_executor("process", workers=4)
+    bot.start()
+    ```
+
+    Parameters:
+
+    * `?kind: str = "process"`: `"process"` or `"thread"`.
+    * `?workers: int`: The amount of workers. Defaults to the amount of CPUs, and is ignored if the executor was already created.
+
+    Returns:
+
+    `Executor`
+    """
+    executor = _executor(kind, workers)
+    amount = executor._max_workers
+    for future in [executor.submit(_ready) for _ in range(amount)]:
+        future.result()
+    log.debug("Warmed %d %s workers", amount, kind)
+    return executor
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """
+    Stops the shared executors. They are created again when they are next needed.
+
+    Parameters:
+
+    * `?wait: bool = True`: Whether to wait for the running functions to finish.
+    """
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown(wait=wait)
+
+
+class offload:
+    """
+    A decorator for running the body of a command in an executor, off the event loop.
+
+    The decorated function is a plain, pure function of the options of the command. It runs in
+    a shared process or thread pool, and what it returns is sent: a `str`, or a `dict` of
+    arguments for `ctx.send`.
+
+    ```py
+    from interactions.ext.enhanced import offload
+
+    @client.command(...)
+    @offload("process", max_concurrency=2)
+    def word_count(text: str):
+        return f"{len(text.split())} words"
+    ```
+
+    For processes, the function must be importable by its module and name, and models in the
+    options are sent as their JSON. Slow functions are deferred with `auto_defer`.
+
+    Parameters:
+
+    * `?executor: str | Executor = "process"`: `"process"` or `"thread"` for a shared pool, or an executor of your own.
+    * `?extract: Callable[[CommandContext], dict]`: Returns more keyword arguments for the function, from the context.
+    * `?respond: Callable[[CommandContext, Any], Awaitable]`: Sends what the function returned, instead of `ctx.send`.
+    * `?max_concurrency: int`: The most calls of this command running at once. Others wait for their turn.
+    * `?defer_after_ms: float | None = 1000`: The milliseconds after which the interaction is deferred. `None` to never defer.
+    * `?ephemeral: bool = False`: Whether the deferred response is ephemeral.
+    """
+
+    def __init__(
+        self,
+        executor: Union[str, Executor] = "process",
+        *,
+        extract: Optional[Callable[[CommandContext], Dict[str, Any]]] = None,
+        respond: Optional[Callable[[CommandContext, Any], Awaitable]] = None,
+        max_concurrency: Optional[int] = None,
+        defer_after_ms: Optional[float] = 1000,
+        ephemeral: bool = False,
+    ):
+        if isinstance(executor, str) and executor not in {"process", "thread"}:
+            raise ValueError(f"Invalid executor {executor!r}! Must be 'process' or 'thread'!")
+        if not isinstance(executor, (str, Executor)):
+            raise TypeError("Invalid type provided for `executor`! Must be a `str` or `Executor`!")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1!")
+
+        self.executor: Union[str, Executor] = executor
+        self.extract = extract
+        self.respond: Callable[[CommandContext, Any], Awaitable] = respond or _respond
+        self.max_concurrency: Optional[int] = max_concurrency
+        self.defer_after_ms: Optional[float] = defer_after_ms
+        self.ephemeral: bool = ephemeral
+        self.portable: bool = executor == "process" or isinstance(executor, ProcessPoolExecutor)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def __call__(self, func: Callable) -> Coroutine:
+        if isinstance(func, Command):
+            raise SyntaxError("Offloads must go below command decorators!")
+        if iscoroutinefunction(func):
+            raise TypeError("Offloaded functions must be plain functions, not coroutines!")
+
+        # a spawned worker runs the script of the bot as `__mp_main__`, not `__main__`
+        module = "__main__" if func.__module__ == "__mp_main__" else func.__module__
+        key = f"{module}:{func.__qualname__}"
+        _functions[key] = func
+        func.offload = self
+
+        @wraps(func)
+        async def wrapper(ctx: CommandContext, *args, **kwargs):
+            if not isinstance(ctx, _Context):  # a method of an extension, which gets no `self`
+                ctx, args = args[0], args[1:]
+            if self.extract is not None:
+                kwargs.update(self.extract(ctx))
+            if self.portable:
+                args, kwargs = _portable(args), _portable(kwargs)
+
+            executor = _executor(self.executor) if isinstance(self.executor, str) else self.executor
+            call = partial(_call, key, args, kwargs)
+            loop = asyncio.get_running_loop()
+            if self.max_concurrency is None:
+                result = await loop.run_in_executor(executor, call)
+            else:
+                if self._semaphore is None:
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                async with self._semaphore:
+                    result = await loop.run_in_executor(executor, call)
+            await self.respond(ctx, result)
+
+        # the command also receives the context, and `self` in extensions
+        received = ["self", "ctx"] if "." in func.__qualname__ else ["ctx"]
+        wrapper.__signature__ = signature(func).replace(
+            parameters=[
+                *(Parameter(name, Parameter.POSITIONAL_OR_KEYWORD) for name in received),
+                *signature(func).parameters.values(),
+            ]
+        )
+
+        if self.defer_after_ms is None:
+            return wrapper
+        return auto_defer(self.defer_after_ms, ephemeral=self.ephemeral)(wrapper)
@@ -11,14 +11,47 @@ GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/e
 (c) 2022 interactions-py.
 """
 import types
+from asyncio import Future
+from importlib.util import resolve_name
+from inspect import isawaitable
 from logging import Logger
-from re import fullmatch
-from typing import Union
+from re import Pattern, compile
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
-from interactions import Client, CommandContext, ComponentContext, Extension
+from interactions import (
+    MISSING,
+    Button,
+    Client,
+    Command,
+    CommandContext,
+    Component,
+    ComponentContext,
+    Extension,
+    Message,
+    SelectMenu,
+    Snowflake,
+)
 from interactions.ext import Base, Version, VersionAuthor
 
 from ._logging import get_logger
+from ._timers import TimerWheel
+from .autocomplete import AutocompleteHandler, AutocompleteIndex, _focused, _subcommand_path
+from .commands import _release_pending, materialize_options
+from .limiters import SendLimiter, enable_send_limiter
+from .profiler import active_profiler, disable_profiler, profiled
+from .sync import GLOBAL, SyncState, sync_changed
 
 __all__ = ("Enhanced", "setup")
 
@@ -46,6 +79,92 @@ base = Base(
 )
 
 
+class _Waiter(NamedTuple):
+    """A pending `Enhanced.wait_for_component` call."""
+
+    future: Future
+    custom_ids: Optional[FrozenSet[str]]
+    check: Optional[Callable[[ComponentContext], Union[bool, Awaitable[bool]]]]
+
+
+class _Routes:
+    """
+    The `startswith` and `regex` callbacks of components and modals, by event name.
+
+    Routes are kept in the order they were registered, and are added and removed one event at a
+    time as callbacks are registered and released.
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, Tuple[bool, Union[str, Pattern]]]] = {
+            "component": {},
+            "modal": {},
+        }
+
+    def add(self, event: str, func: Callable) -> None:
+        kind = event.split("_", 1)[0]
+        routes = self._routes.get(kind)
+        if routes is None or event in routes:
+            return
+        if hasattr(func, "startswith"):
+            routes[event] = (True, event.replace(f"{kind}_startswith_", "", 1))
+        elif hasattr(func, "regex"):
+            routes[event] = (False, compile(func.regex))
+
+    def refresh(self, event: str, funcs: Iterable[Callable]) -> None:
+        """Updates the route of an event after callbacks were removed from it."""
+        routes = self._routes.get(event.split("_", 1)[0])
+        if routes is None:
+            return
+        routes.pop(event, None)
+        for func in funcs:
+            self.add(event, func)
+
+    def match(self, kind: str, custom_id: str, events: Dict[str, List[Callable]]) -> Optional[str]:
+        """Returns the first event whose route matches the `custom_id`."""
+        routes = self._routes[kind]
+        stale = []
+        matched = None
+        for event, (startswith, pattern) in routes.items():
+            if not events.get(event):  # removed from the dispatcher without being released
+                stale.append(event)
+            elif custom_id.startswith(pattern) if startswith else pattern.fullmatch(custom_id):
+                matched = event
+                break
+        for event in stale:
+            del routes[event]
+        return matched
+
+
+def _refresh_options(cmd: Command, built: Dict[int, Callable]) -> None:
+    """
+    Gives the subcommands of a command the options built for them since they were registered.
+
+    `Command.subcommand` copies the options of a coroutine when it is decorated, which for lazy
+    options is still an empty list.
+    """
+    if id(cmd.coro) in built:
+        cmd.num_options[cmd.name] = len([opt for opt in cmd.options if int(opt.type) > 2])
+
+    for path, coro in cmd.coroutines.items():
+        target = built.get(id(getattr(coro, "__wrapped__", coro)))
+        if target is None or not target._options:
+            continue
+        *group, name = path.split(" ")
+        parents = cmd.options
+        if group:
+            parents = next(
+                (opt.options for opt in cmd.options if int(opt.type) == 2 and opt.name == group[0]),
+                [],
+            )
+        for option in parents:
+            if int(option.type) == 1 and option.name == name:
+                option.options = [*(option.options or []), *target._options]
+                option._json["options"] = [opt._json for opt in option.options]
+                cmd.num_options[path] = len([opt for opt in option.options if int(opt.type) > 2])
+                break
+
+
 class Enhanced(Extension):
     """
     This is the core of this library, initialized when loading the extension.
@@ -62,6 +181,8 @@ class Enhanced(Extension):
     * `(?)bot: Client`: The client instance. Not required if using `client.load("interactions.ext.enhanced", ...)`.
     * `?ignore_warning: bool`: Whether to ignore the warning. Defaults to `False`.
     * `?modify_callbacks: bool`: Whether to modify callback decorators. Defaults to `True`.
+    * `?sync_state: str`: A file to keep the fingerprints of synced commands in. If given, only commands that changed since the last sync are synced.
+    * `?send_limiter: bool | SendLimiter`: Whether to queue follow-ups and edits of contexts on token buckets per channel and route, or the `SendLimiter` to use. Defaults to `False`.
     """
 
     def __init__(
@@ -70,6 +191,8 @@ class Enhanced(Extension):
         *,
         ignore_warning: bool = False,
         modify_callbacks: bool = True,
+        sync_state: Optional[str] = None,
+        send_limiter: Union[bool, SendLimiter] = False,
     ):
         if not isinstance(bot, Client):
             log.critical("The bot is not an instance of Client")
@@ -77,62 +200,366 @@ class Enhanced(Extension):
                 raise TypeError(f"{bot.__class__.__name__} is not interactions.Client!")
         log.debug("The bot is an instance of Client")
 
+        self._modify_callbacks: bool = modify_callbacks
+        self._waiters: Dict[str, List[_Waiter]] = {}
+        self._wheel: TimerWheel = TimerWheel()
+
         if modify_callbacks:
             from .callbacks import component, modal
 
             log.debug("Modifying component callbacks (modify_callbacks)")
             bot.component = types.MethodType(component, bot)
 
-            bot.event(self._on_component, name="on_component")
-            log.debug("Registered on_component")
-
             log.debug("Modifying modal callbacks (modify_callbacks)")
             bot.modal = types.MethodType(modal, bot)
 
             bot.event(self._on_modal, name="on_modal")
             log.debug("Registered on_modal")
 
+        bot.event(self._on_component, name="on_component")
+        log.debug("Registered on_component")
+
+        self._autocomplete: Dict[
+            Tuple[str, str, str], Union[AutocompleteIndex, AutocompleteHandler]
+        ] = {}
+        bot.event(self._on_autocomplete, name="on_autocomplete")
+        log.debug("Registered on_autocomplete")
+
+        self._routes: _Routes = _Routes()
+        self._owned: Dict[Optional[str], List[Tuple[str, Callable]]] = {}
+        for event, funcs in bot._websocket._dispatch.events.items():
+            for func in funcs:
+                self.__track(event, func)
+
+        register = bot.event
+
+        def register_and_track(coro: Callable = MISSING, *, name: Optional[str] = MISSING):
+            if coro is MISSING:
+                return lambda _coro: register_and_track(_coro, name=name)
+            register(coro, name=name)
+            self.__track(coro.__name__ if name is MISSING else name, coro)
+            return coro
+
+        bot.event = register_and_track
+        log.debug("Tracking the callbacks of every extension")
+
+        remove = bot.remove
+
+        def release_and_remove(name: str, remove_commands: bool = True, package=None):
+            try:
+                _name = resolve_name(name, package)
+            except (AttributeError, ImportError, ValueError):
+                _name = name
+            if _name in bot._extensions:
+                self.__release(_name, remove_commands)
+            return remove(name, remove_commands=remove_commands, package=package)
+
+        bot.remove = release_and_remove
+        log.debug("Releasing the callbacks of removed extensions")
+
+        resolve_commands = bot._Client__resolve_commands
+
+        @profiled("resolve_commands", lambda: ("interactions", "Client.__resolve_commands"))
+        def materialize_and_resolve_commands():
+            built = {id(coro): coro for coro in materialize_options()}
+            if built:
+                for cmd in bot._commands:
+                    _refresh_options(cmd, built)
+            resolve_commands()
+
+        bot._Client__resolve_commands = materialize_and_resolve_commands
+        log.debug("Materializing lazy options before resolving commands")
+
+        self._sync_state: Optional[str] = sync_state
+        if sync_state is not None:
+            self._full_sync = bot._Client__sync
+            bot._Client__sync = self.__fingerprint_sync
+            log.debug("Syncing changed commands only (sync_state)")
+
+        if send_limiter:
+            enable_send_limiter(None if send_limiter is True else send_limiter)
+            log.debug("Limiting follow-ups and edits (send_limiter)")
+
+        if active_profiler() is not None:
+            bot.event(self._on_start, name="on_start")
+            log.debug("Registered on_start for the registration profiler")
+
         log.info("Hooks applied")
 
+    def __track(self, event: str, func: Callable) -> None:
+        """Records a registered callback under the module it was defined in."""
+        self._owned.setdefault(getattr(func, "__module__", None), []).append((event, func))
+        self._routes.add(event, func)
+
+    def __extensions_of(self, name: str) -> List[Extension]:
+        """The `Extension`s created by a loaded module, including those built by `AltExt`."""
+        from .alt_ext import AltExt
+
+        loaded = self.client._extensions.get(name)
+        if not isinstance(loaded, types.ModuleType):
+            return [loaded] if isinstance(loaded, Extension) else []
+
+        extensions = []
+        for value in vars(loaded).values():
+            if isinstance(value, AltExt):
+                extension = getattr(value, "extension", None)
+            elif (
+                isinstance(value, type)
+                and issubclass(value, Extension)
+                and value.__module__ == name
+            ):
+                extension = self.client._extensions.get(value.__name__)
+            else:
+                continue
+            if isinstance(extension, Extension) and extension not in extensions:
+                extensions.append(extension)
+        return extensions
+
+    def __release(self, name: str, remove_commands: bool) -> None:
+        """
+        Removes the callbacks, commands and cached state of an extension before it is removed.
+
+        The `Extension`s of the module are emptied and unregistered, so `Client.remove` has
+        nothing left to tear down.
+        """
+        client = self.client
+        events = client._websocket._dispatch.events
+        extensions = self.__extensions_of(name)
+
+        handlers = self._owned.pop(name, [])
+        commands: Set[str] = set()
+        for extension in extensions:
+            handlers.extend(
+                (event, func) for event, funcs in extension._listeners.items() for func in funcs
+            )
+            commands.update(cmd.split("_", 1)[1] for cmd in extension._commands)
+            extension._listeners = {}
+            extension._commands = {}
+        commands.update(
+            cmd.name for cmd in client._commands if getattr(cmd.coro, "__module__", None) == name
+        )
+
+        released: Set[str] = set()
+        for event, func in handlers:
+            funcs = events.get(event)
+            if funcs is not None and func in funcs:
+                funcs.remove(func)
+                released.add(event)
+        for cmd in commands:
+            if events.pop(f"command_{cmd}", None) is not None:
+                released.add(f"command_{cmd}")
+        for event in released:
+            funcs = events.get(event)
+            if funcs == []:
+                del events[event]
+            self._routes.refresh(event, funcs or ())
+
+        if commands:
+            client._commands[:] = [cmd for cmd in client._commands if cmd.name not in commands]
+            coroutines = client._Client__command_coroutines
+            coroutines[:] = [coro for coro in coroutines if coro._name not in commands]
+            for key in [key for key in self._autocomplete if key[0] in commands]:
+                del self._autocomplete[key]
+        id_autocomplete = getattr(client, "_Client__id_autocomplete", {})
+        for command_id, autocompletes in tuple(id_autocomplete.items()):
+            autocompletes[:] = [
+                autocomplete
+                for autocomplete in autocompletes
+                if getattr(autocomplete["coro"], "__module__", None) != name
+            ]
+            if not autocompletes:
+                del id_autocomplete[command_id]
+        _release_pending(name)
+
+        if isinstance(client._extensions.get(name), types.ModuleType):
+            # `Client.remove` leaves them registered by class name, which keeps them alive
+            for extension in extensions:
+                if client._extensions.get(type(extension).__name__) is extension:
+                    del client._extensions[type(extension).__name__]
+            if (
+                commands
+                and remove_commands
+                and client._automate_sync
+                and client._websocket.ready.is_set()
+            ):
+                client._loop.create_task(client._Client__sync())
+
+        log.debug("Released %d callbacks and %d commands of %s", len(handlers), len(commands), name)
+
+    async def __fingerprint_sync(self):
+        """Syncs only the commands whose fingerprint changed since the last sync."""
+        client = self.client
+        state = SyncState(self._sync_state, client.me.id)
+        commands = [coro._command_data for coro in client._Client__command_coroutines]
+
+        if not state.scopes:
+            log.info("No sync state at %s, syncing every command", self._sync_state)
+            await self._full_sync()
+            synced = {GLOBAL: client._Client__global_commands.get("commands", [])}
+            for guild_id, guild_commands in client._Client__guild_commands.items():
+                synced[str(guild_id)] = guild_commands.get("commands", [])
+            state.record_synced(commands, synced)
+            state.save()
+            return
+
+        plan = state.diff(commands)
+        if plan:
+            await sync_changed(client._http, client.me.id, plan, state)
+        else:
+            log.info("%d commands unchanged since the last sync", plan.unchanged)
+        await client._Client__get_all_commands()
+
+    async def wait_for_component(
+        self,
+        message_id: Union[Message, Snowflake, int, str],
+        custom_ids: Optional[
+            Union[str, Button, SelectMenu, Iterable[Union[str, Button, SelectMenu]]]
+        ] = None,
+        check: Optional[Callable[[ComponentContext], Union[bool, Awaitable[bool]]]] = None,
+        timeout: Optional[float] = None,
+    ) -> ComponentContext:
+        """
+        Waits for the next component interaction on a message.
+
+        ```py
+        enhanced = bot.load("interactions.ext.enhanced")
+
+        @bot.command()
+        async def confirm(ctx):
+            msg = await ctx.send("Are you sure?", components=Button(1, "Yes", custom_id="yes"))
+            try:
+                button_ctx = await enhanced.wait_for_component(msg, "yes", timeout=30)
+            except asyncio.TimeoutError:
+                return await msg.edit("Too late!", components=[])
+            await button_ctx.send("Done!")
+        ```
+
+        Timeouts are handled by a shared timer wheel with a resolution of 0.1 seconds.
+
+        Parameters:
+
+        * `message_id: Message | Snowflake | int | str`: The message to wait on.
+        * `?custom_ids: str | Button | SelectMenu | list[str | Button | SelectMenu]`: The custom_ids to accept. Defaults to any.
+        * `?check: Callable[[ComponentContext], bool]`: A function, or coroutine, the context must pass.
+        * `?timeout: float`: The amount of seconds to wait before raising `asyncio.TimeoutError`.
+
+        Returns:
+
+        `ComponentContext`
+        """
+        message_id = str(message_id.id if isinstance(message_id, Message) else message_id)
+        if isinstance(custom_ids, (str, Button, SelectMenu)):
+            custom_ids = [custom_ids]
+        ids: Optional[FrozenSet[str]] = (
+            frozenset(
+                Component(**_id._json).custom_id if isinstance(_id, (Button, SelectMenu)) else _id
+                for _id in custom_ids
+            )
+            if custom_ids
+            else None
+        )
+
+        waiter = _Waiter(self.client._loop.create_future(), ids, check)
+        waiters = self._waiters.setdefault(message_id, [])
+        waiters.append(waiter)
+        timer = self._wheel.schedule(timeout, waiter.future) if timeout is not None else None
+        log.debug("Waiting for a component on %s", message_id)
+
+        try:
+            return await waiter.future
+        finally:
+            if timer is not None:
+                timer.cancel()
+            waiters.remove(waiter)
+            if not waiters:
+                self._waiters.pop(message_id, None)
+
+    async def __resolve_waiters(self, ctx: ComponentContext):
+        waiters = self._waiters.get(str(ctx.message.id)) if ctx.message else None
+        if not waiters:
+            return
+
+        for waiter in tuple(waiters):
+            if waiter.future.done():
+                continue
+            if waiter.custom_ids is not None and ctx.data.custom_id not in waiter.custom_ids:
+                continue
+            if waiter.check is not None:
+                passed = waiter.check(ctx)
+                if isawaitable(passed):
+                    passed = await passed
+                if not passed or waiter.future.done():
+                    continue
+            waiter.future.set_result(ctx)
+
     async def __callback(self, ctx: Union[ComponentContext, CommandContext]):
         callback = "component" if isinstance(ctx, ComponentContext) else "modal"
-        websocket = self.client._websocket
+        dispatch = self.client._websocket._dispatch
 
-        if not any(
-            any(hasattr(func, "startswith") or hasattr(func, "regex") for func in funcs)
-            for _, funcs in websocket._dispatch.events.items()
-        ):
-            return
+        event = self._routes.match(callback, ctx.data.custom_id, dispatch.events)
+        if event is not None:
+            log.info("%s matched %s", ctx.data.custom_id, event)
+            return dispatch.dispatch(event, ctx)
 
-        for decorator_custom_id, funcs in websocket._dispatch.events.items():
-            for func in funcs:
-                if hasattr(func, "startswith"):
-                    if ctx.data.custom_id.startswith(
-                        decorator_custom_id.replace(f"{callback}_startswith_", "")
-                    ):
-                        log.info(f"{func} startswith {func.startswith} matched")
-                        return websocket._dispatch.dispatch(decorator_custom_id, ctx)
-                elif hasattr(func, "regex") and fullmatch(
-                    func.regex,
-                    ctx.data.custom_id.replace(f"{callback}_regex_", ""),
-                ):
-                    log.info(f"{func} regex {func.regex} matched")
-                    return websocket._dispatch.dispatch(decorator_custom_id, ctx)
+    async def _on_start(self):
+        """on_start callback that emits the registration profile, once commands are synced."""
+        profiler = disable_profiler()
+        if profiler is not None:
+            profiler.emit()
 
     async def _on_component(self, ctx: ComponentContext):
-        """on_component callback for modified callbacks."""
-        return await self.__callback(ctx)
+        """on_component callback for component waiters and modified callbacks."""
+        if self._waiters:
+            await self.__resolve_waiters(ctx)
+        if self._modify_callbacks:
+            return await self.__callback(ctx)
 
     async def _on_modal(self, ctx: CommandContext):
         """on_modal callback for modified callbacks."""
         return await self.__callback(ctx)
 
+    def __autocomplete_source(
+        self, command: str, path: str, option: str
+    ) -> Optional[Union[AutocompleteIndex, AutocompleteHandler]]:
+        key = (command, path, option)
+        source = self._autocomplete.get(key)
+        if source is not None:
+            return source
+        for cmd in self.client._commands:
+            if cmd.name != command:
+                continue
+            coro = cmd.coroutines.get(path) if path else cmd.coro
+            # `Command` wraps subcommands, and sources set after that are on the wrapped one
+            for _coro in (coro, getattr(coro, "__wrapped__", None)):
+                sources = getattr(_coro, "_autocomplete_sources", None)
+                if sources and option in sources:
+                    # misses are not cached, as an extension loaded later may define the source
+                    source = self._autocomplete[key] = sources[option]
+                    return source
+        return None
+
+    async def _on_autocomplete(self, ctx: CommandContext):
+        """on_autocomplete callback for options with an `autocomplete_source`."""
+        focused = _focused(ctx.data.options or [])
+        if focused is None:
+            return
+        source = self.__autocomplete_source(
+            ctx.data.name, _subcommand_path(ctx.data.options or []), focused[0]
+        )
+        if source is None:
+            return
+        if isinstance(source, AutocompleteHandler):
+            return await source(ctx, focused[1] or "")
+        await ctx.populate(await source.complete(str(focused[1] or "")))
+
 
 def setup(
     bot: Client,
     *,
     ignore_warning: bool = False,
     modify_callbacks: bool = True,
+    sync_state: Optional[str] = None,
+    send_limiter: Union[bool, SendLimiter] = False,
 ) -> Enhanced:
     """
     This function initializes the core of the library, `Enhanced`.
@@ -149,10 +576,14 @@ def setup(
     * `(?)client: Client`: The client instance. Not required if using `client.load("interactions.ext.enhanced", ...)`.
     * `?ignore_warning: bool`: Whether to ignore the warning. Defaults to `False`.
     * `?modify_callbacks: bool`: Whether to modify callback decorators. Defaults to `True`.
+    * `?sync_state: str`: A file to keep the fingerprints of synced commands in. If given, only commands that changed since the last sync are synced.
+    * `?send_limiter: bool | SendLimiter`: Whether to queue follow-ups and edits of contexts on token buckets per channel and route, or the `SendLimiter` to use. Defaults to `False`.
     """
     log.info("Setting up Enhanced")
     return Enhanced(
         bot,
         ignore_warning=ignore_warning,
         modify_callbacks=modify_callbacks,
+        sync_state=sync_state,
+        send_limiter=send_limiter,
     )
@@ -0,0 +1,292 @@
+"""
+limiters
+
+Content:
+
+* SendLimiter: outbound token buckets per channel and route
+* LimiterStats: queue depth and counters of a send limiter
+* enable_send_limiter: limits the sends and edits of contexts
+* disable_send_limiter: stops limiting the sends and edits of contexts
+* active_send_limiter: returns the send limiter in use
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/limiters.py
+
+(c) 2022 interactions-py.
+"""
+import asyncio
+from functools import wraps
+from time import monotonic
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from interactions import CommandContext, ComponentContext
+
+from ._logging import get_logger
+
+__all__ = (
+    "SendLimiter",
+    "LimiterStats",
+    "enable_send_limiter",
+    "disable_send_limiter",
+    "active_send_limiter",
+)
+
+log = get_logger("enhanced.limiters")
+
+_active: Optional["SendLimiter"] = None
+_originals: Dict[Tuple[type, str], Callable] = {}
+
+
+class LimiterStats(NamedTuple):
+    """
+    The queue depth and counters of a send limiter.
+
+    Parameters:
+
+    * `waiting: int`: How many calls are queued right now.
+    * `sent: int`: How many calls went out without waiting.
+    * `queued: int`: How many calls waited for a token.
+    * `overflowed: int`: How many calls would have waited longer than `max_wait`, and went out without waiting.
+    * `waited: float`: The seconds that queued calls waited, in total.
+    """
+
+    waiting: int
+    sent: int
+    queued: int
+    overflowed: int
+    waited: float
+
+
+class _Bucket:
+    """A token bucket. Tokens are reserved ahead, so queued calls go out in order."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated", "waiting")
+
+    def __init__(self, capacity: int, per: float, now: float):
+        self.capacity: int = capacity
+        self.rate: float = capacity / per
+        self.tokens: float = capacity
+        self.updated: float = now
+        self.waiting: int = 0
+
+    def reserve(self, now: float) -> float:
+        """Takes a token, returning the seconds until it is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def idle(self, now: float) -> bool:
+        return not self.waiting and self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class SendLimiter:
+    """
+    Token buckets that outbound sends and edits of contexts wait on.
+
+    Every call takes a token from the bucket of its channel and from the bucket of its route,
+    the kind of call: `"send"` or `"edit"`. Without a token, the call is queued until one is
+    available, instead of being sent into a rate limit and retried.
+
+    ```py
+    from interactions.ext.enhanced import SendLimiter
+
+    limiter = SendLimiter(channel_rate=5, channel_per=5)
+    client.load("interactions.ext.enhanced", send_limiter=limiter)
+    ...
+    log.info("queued sends: %d", limiter.stats().waiting)
+    ```
+
+    Only follow-ups and edits are limited. The first response to an interaction is never
+    queued, as it must be sent within 3 seconds.
+
+    Parameters:
+
+    * `?channel_rate: int = 5`: The calls allowed per channel every `channel_per` seconds.
+    * `?channel_per: float = 5`: The seconds in which `channel_rate` calls are allowed.
+    * `?route_rate: int = 50`: The calls allowed per route every `route_per` seconds.
+    * `?route_per: float = 1`: The seconds in which `route_rate` calls are allowed.
+    * `?max_wait: float = 5`: The most seconds a call is queued for. Calls that would wait longer are sent right away, and left to the rate limit handling of interactions.py.
+    * `?max_buckets: int = 1024`: The amount of buckets after which idle ones are dropped.
+    """
+
+    def __init__(
+        self,
+        *,
+        channel_rate: int = 5,
+        channel_per: float = 5,
+        route_rate: int = 50,
+        route_per: float = 1,
+        max_wait: float = 5,
+        max_buckets: int = 1024,
+    ):
+        if channel_rate < 1 or route_rate < 1:
+            raise ValueError("`channel_rate` and `route_rate` must be at least 1!")
+        if channel_per <= 0 or route_per <= 0:
+            raise ValueError("`channel_per` and `route_per` must be a positive amount of seconds!")
+        if max_wait < 0:
+            raise ValueError("`max_wait` must not be negative!")
+
+        self.channel_limit: Tuple[int, float] = (channel_rate, channel_per)
+        self.route_limit: Tuple[int, float] = (route_rate, route_per)
+        self.max_wait: float = max_wait
+        self.max_buckets: int = max_buckets
+        self.channels: Dict[Hashable, _Bucket] = {}
+        self.routes: Dict[Hashable, _Bucket] = {}
+        self.sent: int = 0
+        self.queued: int = 0
+        self.overflowed: int = 0
+        self.waited: float = 0.0
+
+    def _bucket(
+        self, buckets: Dict[Hashable, _Bucket], key: Hashable, limit: Tuple[int, float], now: float
+    ) -> _Bucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_buckets:
+                for idle in [name for name, old in buckets.items() if old.idle(now)]:
+                    del buckets[idle]
+            bucket = buckets[key] = _Bucket(*limit, now)
+        return bucket
+
+    async def acquire(self, channel: Hashable, route: Hashable) -> float:
+        """
+        Waits for a token of a channel and of a route.
+
+        Parameters:
+
+        * `channel: Hashable`: The channel the call goes to.
+        * `route: Hashable`: The route of the call.
+
+        Returns:
+
+        `float`: The seconds waited.
+        """
+        now = monotonic()
+        buckets = [
+            self._bucket(self.channels, channel, self.channel_limit, now),
+            self._bucket(self.routes, route, self.route_limit, now),
+        ]
+        delay = max([bucket.reserve(now) for bucket in buckets])
+        if delay <= 0:
+            self.sent += 1
+            return 0.0
+        if delay > self.max_wait:
+            for bucket in buckets:
+                bucket.tokens += 1
+            self.overflowed += 1
+            log.warning("A call to channel %s would wait %.2fs, sending it anyway", channel, delay)
+            return 0.0
+
+        self.queued += 1
+        for bucket in buckets:
+            bucket.waiting += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            for bucket in buckets:
+                bucket.tokens += 1
+            raise
+        finally:
+            for bucket in buckets:
+                bucket.waiting -= 1
+        self.waited += delay
+        return delay
+
+    def depths(self) -> Dict[Tuple[str, Hashable], int]:
+        """
+        Returns how many calls are queued on every busy bucket.
+
+        Returns:
+
+        `dict[tuple[str, Hashable], int]`: The queued calls, by `("channel", id)` and `("route", name)`.
+        """
+        depths = {
+            ("channel", key): bucket.waiting
+            for key, bucket in self.channels.items()
+            if bucket.waiting
+        }
+        depths.update(
+            (("route", key), bucket.waiting)
+            for key, bucket in self.routes.items()
+            if bucket.waiting
+        )
+        return depths
+
+    def stats(self) -> LimiterStats:
+        """
+        Returns the queue depth and counters of the limiter.
+
+        Returns:
+
+        `LimiterStats`
+        """
+        return LimiterStats(
+            sum(bucket.waiting for bucket in self.routes.values()),
+            self.sent,
+            self.queued,
+            self.overflowed,
+            self.waited,
+        )
+
+
+def _limited(method: Callable, route: str) -> Callable:
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        limiter = _active
+        if limiter is not None and self.responded:
+            await limiter.acquire(str(self.channel_id), route)
+        return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def enable_send_limiter(limiter: Optional[SendLimiter] = None) -> SendLimiter:
+    """
+    Limits the sends and edits of every command and component context.
+
+    `Enhanced` calls it when loaded with `send_limiter`:
+
+    ```py
+    client.load("interactions.ext.enhanced", send_limiter=True)
+    ```
+
+    Parameters:
+
+    * `?limiter: SendLimiter`: The limiter to use. Defaults to a `SendLimiter` with the default limits.
+
+    Returns:
+
+    `SendLimiter`: The limiter in use.
+    """
+    global _active
+    if not _originals:
+        for cls in (CommandContext, ComponentContext):
+            for name in ("send", "edit"):
+                method = _originals[cls, name] = vars(cls)[name]
+                setattr(cls, name, _limited(method, name))
+
+    _active = limiter or SendLimiter()
+    log.debug("Send limiter enabled")
+    return _active
+
+
+def disable_send_limiter() -> Optional[SendLimiter]:
+    """
+    Stops limiting the sends and edits of contexts.
+
+    Returns:
+
+    `SendLimiter | None`: The limiter that was in use, if any.
+    """
+    global _active
+    limiter, _active = _active, None
+    for (cls, name), method in _originals.items():
+        setattr(cls, name, method)
+    _originals.clear()
+    if limiter is not None:
+        log.debug("Send limiter disabled")
+    return limiter
+
+
+def active_send_limiter() -> Optional[SendLimiter]:
+    """Returns the send limiter in use, if any."""
+    return _active
@@ -0,0 +1,313 @@
+"""
+profiler
+
+Content:
+
+* ProfiledStep: one timed registration step
+* RegistrationProfiler: times and measures the allocations of registration steps
+* profiled: profiles every call of a registration function
+* enable_profiler: turns the registration profiler on
+* disable_profiler: turns the registration profiler off
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/profiler.py
+
+(c) 2022 interactions-py.
+"""
+import json
+import sys
+import tracemalloc
+from functools import wraps
+from logging import Logger
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ._logging import get_logger
+
+__all__ = (
+    "ProfiledStep",
+    "RegistrationProfiler",
+    "profiled",
+    "enable_profiler",
+    "disable_profiler",
+)
+
+log: Logger = get_logger("enhanced.profiler")
+
+_active: Optional["RegistrationProfiler"] = None
+
+
+class ProfiledStep(NamedTuple):
+    """
+    One registration step, such as setting up the options of a command.
+
+    Times and memory include the steps nested in it, such as `parameters_to_options` inside
+    `setup_options`.
+
+    Parameters:
+
+    * `step: str`: What was done, such as `"setup_options"` or `"AltExt"`.
+    * `origin: str`: The module or extension it was done for.
+    * `target: str`: The command, callback or extension it was done for.
+    * `seconds: float`: How long it took.
+    * `net: int | None`: The bytes it allocated and kept, if allocations are traced.
+    * `peak: int | None`: The most bytes it had allocated at once, if allocations are traced.
+    * `depth: int`: How many steps it was nested in.
+    """
+
+    step: str
+    origin: str
+    target: str
+    seconds: float
+    net: Optional[int]
+    peak: Optional[int]
+    depth: int
+
+    @property
+    def _json(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class _Frame:
+    __slots__ = ("start", "memory", "peak")
+
+    def __init__(self, start: float, memory: int):
+        self.start = start
+        self.memory = memory
+        self.peak = memory
+
+
+class RegistrationProfiler:
+    """
+    Times every registration step, and measures what it allocates with `tracemalloc`.
+
+    Create it with `enable_profiler`. `Enhanced` emits its report once the bot has synced its
+    commands and started, then turns it off.
+
+    Parameters:
+
+    * `?path: str`: A file to write the report to as JSON. Defaults to a table on stderr.
+    * `?allocations: bool = True`: Whether to trace allocations, which slows every step down.
+    """
+
+    def __init__(self, path: Optional[str] = None, allocations: bool = True):
+        self.path: Optional[str] = path
+        self.allocations: bool = allocations
+        self.steps: List[ProfiledStep] = []
+        self._stack: List[_Frame] = []
+        self._started_tracing: bool = False
+
+    def start(self) -> None:
+        """Starts tracing allocations, if they are measured."""
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stops tracing allocations, if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _memory(self) -> Tuple[int, int]:
+        if not (self.allocations and tracemalloc.is_tracing()):
+            return 0, 0
+        return tracemalloc.get_traced_memory()
+
+    def _reset_peak(self) -> None:
+        # the peak of every open frame is kept in the frames, so nested steps can reset it
+        if self._stack and self.allocations and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    def enter(self) -> None:
+        """Starts a step."""
+        memory, peak = self._memory()
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+        self._stack.append(_Frame(perf_counter(), memory))
+        self._reset_peak()
+
+    def exit(self, step: str, origin: str, target: str) -> ProfiledStep:
+        """Ends the innermost step and records it."""
+        seconds = perf_counter()
+        frame = self._stack.pop()
+        seconds -= frame.start
+        memory, peak = self._memory()
+        peak = max(frame.peak, peak)
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+
+        traced = self.allocations and tracemalloc.is_tracing()
+        record = ProfiledStep(
+            step,
+            origin,
+            target,
+            seconds,
+            memory - frame.memory if traced else None,
+            peak - frame.memory if traced and hasattr(tracemalloc, "reset_peak") else None,
+            len(self._stack),
+        )
+        self.steps.append(record)
+        self._reset_peak()
+        return record
+
+    def origins(self) -> Dict[str, float]:
+        """Returns the seconds spent in the outermost steps of every origin, slowest first."""
+        totals: Dict[str, float] = {}
+        for record in self.steps:
+            if record.depth == 0:
+                totals[record.origin] = totals.get(record.origin, 0.0) + record.seconds
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def report(self, limit: Optional[int] = 25) -> str:
+        """
+        Formats the slowest steps, then the time spent per origin, as a table.
+
+        Parameters:
+
+        * `?limit: int = 25`: The amount of steps to show. `None` shows every step.
+
+        Returns:
+
+        `str`
+        """
+        steps = sorted(self.steps, key=lambda record: record.seconds, reverse=True)
+        total = sum(record.seconds for record in self.steps if record.depth == 0)
+        lines = [
+            f"Registration profile: {len(self.steps)} steps, {total * 1000:.2f} ms",
+            f"{'ms':>9} {'net KiB':>9} {'peak KiB':>9}  {'step':<21} target",
+        ]
+        for record in steps[:limit]:
+            net = "-" if record.net is None else f"{record.net / 1024:.1f}"
+            peak = "-" if record.peak is None else f"{record.peak / 1024:.1f}"
+            lines.append(
+                f"{record.seconds * 1000:>9.3f} {net:>9} {peak:>9}  {record.step:<21} "
+                f"{record.origin}:{record.target}"
+            )
+        if limit is not None and len(steps) > limit:
+            lines.append(f"... {len(steps) - limit} faster steps")
+
+        lines.append(f"{'ms':>9}  origin")
+        lines.extend(
+            f"{seconds * 1000:>9.3f}  {origin}" for origin, seconds in self.origins().items()
+        )
+        return "\n".join(lines)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Returns every step, slowest first, and the time spent per origin."""
+        return {
+            "steps": [
+                record._json
+                for record in sorted(self.steps, key=lambda record: record.seconds, reverse=True)
+            ],
+            "origins": self.origins(),
+        }
+
+    def emit(self) -> None:
+        """Writes the report to `path` as JSON, or as a table to stderr."""
+        if self.path is not None:
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self.to_json(), file, indent=2)
+            log.info("Wrote the registration profile of %d steps to %s", len(self.steps), self.path)
+        else:
+            print(self.report(), file=sys.stderr)
+
+
+def _describe(coro: Any = None, *args, **kwargs) -> Optional[Tuple[str, str]]:
+    """The origin and target of a step done for a function, or `None` if there is none yet."""
+    if not callable(coro):
+        return None
+    return (
+        getattr(coro, "__module__", None) or "?",
+        getattr(coro, "__qualname__", None) or repr(coro),
+    )
+
+
+def profiled(
+    step: str, describe: Callable[..., Optional[Tuple[str, str]]] = _describe
+) -> Callable[[Callable], Callable]:
+    """
+    Profiles every call of a registration function while the profiler is on.
+
+    Parameters:
+
+    * `step: str`: The name of the step.
+    * `?describe: Callable[..., tuple[str, str] | None]`: Returns the origin and target from the arguments of the call, or `None` to not profile it. Defaults to the module and name of the first argument.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            described = describe(*args, **kwargs)
+            if described is None:
+                return func(*args, **kwargs)
+
+            profiler.enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit(step, *described)
+
+        return wrapper
+
+    return decorator
+
+
+def enable_profiler(path: Optional[str] = None, allocations: bool = True) -> RegistrationProfiler:
+    """
+    Turns the registration profiler on.
+
+    Call it before the commands and callbacks are defined:
+
+    ```py
+    from interactions.ext.enhanced import enable_profiler
+
+    enable_profiler("startup.json")  # or enable_profiler() for a table on stderr
+
+    bot = interactions.Client(...)
+    bot.load("interactions.ext.enhanced")
+    ```
+
+    Every `setup_options`, `parameters_to_options`, component and modal callback and `AltExt`
+    extension is then timed, and so is the resolution of the commands by `Enhanced`. The report
+    is emitted once the bot has synced its commands and started.
+
+    Parameters:
+
+    * `?path: str`: A file to write the report to as JSON. Defaults to a table on stderr.
+    * `?allocations: bool = True`: Whether to measure allocations with `tracemalloc`.
+
+    Returns:
+
+    `RegistrationProfiler`: The profiler, with the `steps` recorded so far.
+    """
+    global _active
+    if _active is not None:
+        disable_profiler()
+
+    _active = RegistrationProfiler(path, allocations)
+    _active.start()
+    log.debug("Registration profiler enabled")
+    return _active
+
+
+def disable_profiler() -> Optional[RegistrationProfiler]:
+    """
+    Turns the registration profiler off.
+
+    Returns:
+
+    `RegistrationProfiler | None`: The profiler that was on, if any.
+    """
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def active_profiler() -> Optional[RegistrationProfiler]:
+    """Returns the enabled registration profiler, if any."""
+    return _active
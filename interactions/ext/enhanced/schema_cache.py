@@ -0,0 +1,238 @@
+"""
+schema_cache
+
+Content:
+
+* SchemaCache: file-backed cache of the options built by `setup_options`
+* enable_schema_cache: turns the schema cache on
+* disable_schema_cache: turns the schema cache off
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/schema_cache.py
+
+(c) 2022 interactions-py.
+"""
+import atexit
+import json
+import os
+from asyncio import get_running_loop
+from hashlib import sha1
+from inspect import unwrap
+from logging import Logger
+from typing import Any, Callable, Dict, List, Optional
+
+from typing_extensions import _AnnotatedAlias
+
+from interactions import Option
+
+from ._logging import get_logger
+from .command_models import EnhancedOption
+
+__all__ = ("SchemaCache", "enable_schema_cache", "disable_schema_cache")
+
+log: Logger = get_logger("enhanced.schema_cache")
+
+_VERSION: int = 2  # 2 stores converters, which `Option._json` leaves out
+_active: Optional["SchemaCache"] = None
+
+
+def _stable(annotation: Any) -> Any:
+    """
+    Replaces the options in an annotation with their fields, so its `repr` is the same across
+    runs. Anything else with an unstable `repr` only makes the command miss the cache.
+    """
+    if isinstance(annotation, EnhancedOption):
+        return (annotation.type, annotation.name, annotation.description, annotation.kwargs)
+    if isinstance(annotation, _AnnotatedAlias):
+        return (annotation.__origin__, tuple(_stable(arg) for arg in annotation.__metadata__))
+    return annotation
+
+
+def fingerprint(coro: Callable, has_res: bool = False) -> str:
+    """
+    Hashes what the options of a command are built from.
+
+    That is the code, the argument names and which of them have defaults, and the annotations of
+    the function behind any decorators, including their converters. The version of the cache
+    format is hashed too, so entries of older formats miss.
+    """
+    func = unwrap(coro)
+    code = func.__code__
+    digest = sha1(code.co_code)
+    digest.update(
+        repr(
+            (
+                code.co_varnames[: code.co_argcount + code.co_kwonlyargcount],
+                code.co_argcount,
+                len(func.__defaults__ or ()),
+                sorted(func.__kwdefaults__ or ()),
+                has_res,
+                _VERSION,
+                [(name, _stable(value)) for name, value in func.__annotations__.items()],
+            )
+        ).encode()
+    )
+    return digest.hexdigest()
+
+
+def _dump(option: Option) -> Dict[str, Any]:
+    """The JSON of an option, with the converters `Option._json` leaves out."""
+    data = {**option._json, **({"converter": option.converter} if option.converter else {})}
+    if option.options:
+        data["options"] = [_dump(_option) for _option in option.options]
+    return data
+
+
+class SchemaCache:
+    """
+    A cache of the options built by `setup_options`, stored as one compact JSON file.
+
+    Every command is keyed by the module and qualified name of its function, and stores a
+    `fingerprint` of its code and annotations next to its options. A command whose fingerprint
+    did not change loads its options from the cache, skipping `inspect.signature` and the
+    annotation walk.
+
+    Parameters:
+
+    * `path: str`: The path of the cache file. It is created if it does not exist.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.entries: Dict[str, list] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self._dirty: bool = False
+        self._save_scheduled: bool = False
+        self.load()
+
+    @staticmethod
+    def key(coro: Callable) -> str:
+        """Returns the key of a command's function."""
+        return f"{coro.__module__}:{coro.__qualname__}"
+
+    def load(self) -> None:
+        """Loads the cache file, discarding it if it is unreadable or from another version."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            log.warning("Discarding the schema cache at %s: %s", self.path, error)
+            return
+
+        if isinstance(data, dict) and data.get("version") == _VERSION:
+            self.entries = data.get("commands", {})
+
+    def save(self) -> None:
+        """Writes the cache file, if anything changed since it was loaded or saved."""
+        self._save_scheduled = False
+        if not self._dirty:
+            return
+
+        temp = f"{self.path}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump({"version": _VERSION, "commands": self.entries}, file, separators=(",", ":"))
+        os.replace(temp, self.path)
+        self._dirty = False
+        log.debug("Saved %d commands to the schema cache", len(self.entries))
+
+    def get(self, coro: Callable, digest: str):
+        """
+        Gets the cached options of a command.
+
+        Parameters:
+
+        * `coro: Callable`: The command's function.
+        * `digest: str`: The current `fingerprint` of the function.
+
+        Returns:
+
+        `list[Option] | None | False`: The options, `None` if the function has no options to set
+        up, or `False` if it is not cached or changed.
+        """
+        entry = self.entries.get(self.key(coro))
+        if entry is None or entry[0] != digest:
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return None if entry[1] is None else [Option(**option) for option in entry[1]]
+
+    def put(self, coro: Callable, digest: str, options: Optional[List[Option]]) -> None:
+        """
+        Caches the options of a command, and schedules the file to be saved.
+
+        Parameters:
+
+        * `coro: Callable`: The command's function.
+        * `digest: str`: The current `fingerprint` of the function.
+        * `options: list[Option] | None`: The options, or `None` if it has no options to set up.
+        """
+        self.entries[self.key(coro)] = [
+            digest,
+            None if options is None else [_dump(option) for option in options],
+        ]
+        self._dirty = True
+
+        if self._save_scheduled:
+            return
+        try:
+            get_running_loop().call_soon(self.save)
+            self._save_scheduled = True
+        except RuntimeError:  # not in a loop, so the file is saved on exit
+            pass
+
+
+def enable_schema_cache(path: str = ".enhanced_schema.json") -> SchemaCache:
+    """
+    Turns the schema cache on for `setup_options`.
+
+    Call it before the commands are defined:
+
+    ```py
+    from interactions.ext.enhanced import enable_schema_cache
+
+    enable_schema_cache(".enhanced_schema.json")
+
+    @bot.command()
+    @setup_options
+    async def command(ctx, option: EnhancedOption(str)):
+        ...
+    ```
+
+    The file is saved right after commands are defined inside the event loop, and on exit.
+
+    Parameters:
+
+    * `?path: str = ".enhanced_schema.json"`: The path of the cache file.
+
+    Returns:
+
+    `SchemaCache`: The cache, with its `hits` and `misses`.
+    """
+    global _active
+    if _active is not None:
+        if _active.path == path:
+            return _active
+        disable_schema_cache()
+
+    _active = SchemaCache(path)
+    atexit.register(_active.save)
+    log.debug("Schema cache enabled at %s (%d commands)", path, len(_active.entries))
+    return _active
+
+
+def disable_schema_cache() -> None:
+    """Saves and turns off the schema cache."""
+    global _active
+    if _active is None:
+        return
+    atexit.unregister(_active.save)
+    _active.save()
+    _active = None
+
+
+def active_schema_cache() -> Optional[SchemaCache]:
+    """Returns the enabled schema cache, if any."""
+    return _active
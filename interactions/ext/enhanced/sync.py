@@ -0,0 +1,322 @@
+"""
+sync
+
+Content:
+
+* canonicalize: canonical serialization of a command or its options
+* fingerprint_command: hash of a command's schema
+* fingerprint_options: hash of a list of options
+* SyncPlan: the commands to create, update or delete
+* SyncState: fingerprints of the commands synced last, stored in a file
+* sync_changed: syncs only the commands that changed
+
+GitHub: https://github.com/interactions-py/enhanced/blob/main/interactions/ext/enhanced/sync.py
+
+(c) 2022 interactions-py.
+"""
+import json
+import os
+from hashlib import sha256
+from logging import Logger
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from interactions import Option
+
+from ._logging import get_logger
+
+__all__ = (
+    "canonicalize",
+    "fingerprint_command",
+    "fingerprint_options",
+    "SyncPlan",
+    "SyncState",
+    "sync_changed",
+)
+
+log: Logger = get_logger("enhanced.sync")
+
+_VERSION: int = 2  # 2 keys commands by type and name
+_IGNORED_KEYS = frozenset({"id", "application_id", "guild_id", "version"})
+GLOBAL: str = "global"
+
+
+def _strip(obj: Any) -> Any:
+    """Drops unset values and ids, and unwraps models, so equal schemas serialize equally."""
+    if hasattr(obj, "_json"):
+        obj = obj._json
+    if isinstance(obj, dict):
+        return {
+            str(key): _strip(value)
+            for key, value in obj.items()
+            if value is not None and key not in _IGNORED_KEYS
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_strip(item) for item in obj]
+    return obj
+
+
+def canonicalize(data: Union[dict, Option, List[Option]]) -> str:
+    """
+    Serializes a command, an option or a list of options canonically.
+
+    Keys are sorted, unset values and ids are dropped, and the order of options and choices is
+    kept, as it is shown to users.
+
+    Parameters:
+
+    * `data: dict | Option | list[Option]`: What to serialize.
+
+    Returns:
+
+    `str`: Compact JSON.
+    """
+    return json.dumps(
+        _strip(data), sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=int
+    )
+
+
+def fingerprint_command(data: dict) -> str:
+    """
+    Hashes the schema of a command, as in `Command.full_data`.
+
+    Parameters:
+
+    * `data: dict`: The command's payload.
+
+    Returns:
+
+    `str`: The sha256 hex digest of its canonical serialization.
+    """
+    return sha256(canonicalize(data).encode()).hexdigest()
+
+
+def fingerprint_options(options: List[Option]) -> str:
+    """
+    Hashes a list of options, as built by `setup_options` or `parameters_to_options`.
+
+    Parameters:
+
+    * `options: list[Option]`: The options.
+
+    Returns:
+
+    `str`: The sha256 hex digest of their canonical serialization.
+    """
+    return sha256(canonicalize(options).encode()).hexdigest()
+
+
+def _key(command: dict) -> str:
+    """
+    The key of a command within its scope, `"<type>:<name>"`. A slash, user and message command
+    may share a name.
+    """
+    return f"{int(command.get('type') or 1)}:{command['name']}"
+
+
+def _scoped(commands: Iterable[Union[dict, List[dict]]]) -> Dict[str, Dict[str, dict]]:
+    """Groups command payloads by scope, then by type and name."""
+    scopes: Dict[str, Dict[str, dict]] = {}
+    for data in commands:
+        for command in data if isinstance(data, list) else [data]:
+            scope = str(command["guild_id"]) if command.get("guild_id") else GLOBAL
+            scopes.setdefault(scope, {})[_key(command)] = command
+    return scopes
+
+
+class SyncPlan:
+    """
+    The difference between the commands of the bot and the ones synced last.
+
+    Parameters:
+
+    * `upsert: dict[str, list[tuple[str, dict]]]`: The fingerprint and payload of every new or changed command, per scope.
+    * `delete: dict[str, dict[str, str | None]]`: The id of every removed command, by `"<type>:<name>"`, per scope.
+    * `unchanged: int`: The amount of commands that did not change.
+    """
+
+    def __init__(
+        self,
+        upsert: Dict[str, List[Tuple[str, dict]]],
+        delete: Dict[str, Dict[str, Optional[str]]],
+        unchanged: int,
+    ):
+        self.upsert = upsert
+        self.delete = delete
+        self.unchanged = unchanged
+
+    def __bool__(self) -> bool:
+        return bool(self.upsert or self.delete)
+
+    def __repr__(self) -> str:
+        return (
+            f"<SyncPlan upsert={sum(map(len, self.upsert.values()))}, "
+            f"delete={sum(map(len, self.delete.values()))}, unchanged={self.unchanged}>"
+        )
+
+
+class SyncState:
+    """
+    The fingerprints and ids of the commands synced last, stored as one compact JSON file.
+
+    ```py
+    state = SyncState(".enhanced_sync.json", application_id=bot.me.id)
+    plan = state.diff(coro._command_data for coro in commands)
+    if plan:
+        await sync_changed(bot._http, bot.me.id, plan, state)
+    ```
+
+    Parameters:
+
+    * `path: str`: The path of the state file. It is created if it does not exist.
+    * `?application_id: int | str`: The bot's application id. A state file of another application is ignored.
+    """
+
+    def __init__(self, path: str, application_id: Optional[Union[int, str]] = None):
+        self.path: str = path
+        self.application_id: Optional[str] = (
+            str(application_id) if application_id is not None else None
+        )
+        self.scopes: Dict[str, Dict[str, List[Optional[str]]]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Loads the state file, discarding it if it is unreadable, old or of another bot."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            log.warning("Discarding the sync state at %s: %s", self.path, error)
+            return
+
+        if (
+            isinstance(data, dict)
+            and data.get("version") == _VERSION
+            and data.get("application_id") == self.application_id
+        ):
+            self.scopes = data.get("scopes", {})
+
+    def save(self) -> None:
+        """Writes the state file."""
+        temp = f"{self.path}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": _VERSION, "application_id": self.application_id, "scopes": self.scopes},
+                file,
+                separators=(",", ":"),
+            )
+        os.replace(temp, self.path)
+
+    def diff(self, commands: Iterable[Union[dict, List[dict]]]) -> SyncPlan:
+        """
+        Compares commands against the ones synced last.
+
+        Parameters:
+
+        * `commands: Iterable[dict | list[dict]]`: The payloads of the commands, such as the `_command_data` of command coroutines.
+
+        Returns:
+
+        `SyncPlan`
+        """
+        current = _scoped(commands)
+        upsert: Dict[str, List[Tuple[str, dict]]] = {}
+        delete: Dict[str, Dict[str, Optional[str]]] = {}
+        unchanged = 0
+
+        for scope, keyed in current.items():
+            synced = self.scopes.get(scope, {})
+            for key, command in keyed.items():
+                digest = fingerprint_command(command)
+                if key in synced and synced[key][0] == digest:
+                    unchanged += 1
+                else:
+                    upsert.setdefault(scope, []).append((digest, command))
+
+        for scope, synced in self.scopes.items():
+            removed = {
+                key: entry[1] for key, entry in synced.items() if key not in current.get(scope, {})
+            }
+            if removed:
+                delete[scope] = removed
+
+        return SyncPlan(upsert, delete, unchanged)
+
+    def record(self, scope: str, key: str, digest: str, command_id: Optional[str]) -> None:
+        """Records that a command was synced, by `"<type>:<name>"`."""
+        self.scopes.setdefault(scope, {})[key] = [digest, command_id]
+
+    def forget(self, scope: str, key: str) -> None:
+        """Records that a command was deleted, by `"<type>:<name>"`."""
+        synced = self.scopes.get(scope)
+        if synced is None:
+            return
+        synced.pop(key, None)
+        if not synced:
+            del self.scopes[scope]
+
+    def record_synced(
+        self, commands: Iterable[Union[dict, List[dict]]], synced: Dict[str, List[dict]]
+    ) -> None:
+        """
+        Replaces the state after a full sync.
+
+        Parameters:
+
+        * `commands: Iterable[dict | list[dict]]`: The payloads of the commands that were synced.
+        * `synced: dict[str, list[dict]]`: The commands the API returned, with their ids, per scope.
+        """
+        self.scopes = {}
+        for scope, keyed in _scoped(commands).items():
+            ids = {_key(command): command.get("id") for command in synced.get(scope, [])}
+            for key, command in keyed.items():
+                self.record(scope, key, fingerprint_command(command), ids.get(key))
+
+
+async def sync_changed(
+    http, application_id: Union[int, str], plan: SyncPlan, state: SyncState
+) -> SyncPlan:
+    """
+    Syncs only the commands in a plan, then saves the state.
+
+    New and changed commands are upserted one by one, and removed commands are deleted by id,
+    so unchanged commands and scopes cost no requests.
+
+    Parameters:
+
+    * `http: HTTPClient`: The client's HTTP client, or anything with the same `create_application_command` and `delete_application_command` coroutines.
+    * `application_id: int | str`: The bot's application id.
+    * `plan: SyncPlan`: The plan, from `SyncState.diff`.
+    * `state: SyncState`: The state to update.
+
+    Returns:
+
+    `SyncPlan`: The plan that was applied.
+    """
+    application_id = int(application_id)
+    for scope, commands in plan.upsert.items():
+        guild_id = None if scope == GLOBAL else int(scope)
+        for digest, command in commands:
+            data = {key: value for key, value in command.items() if key != "guild_id"}
+            res = await http.create_application_command(
+                application_id=application_id, data=data, guild_id=guild_id
+            )
+            state.record(scope, _key(command), digest, res.get("id") if res else None)
+            log.debug("Synced %s in %s", command["name"], scope)
+
+    for scope, removed in plan.delete.items():
+        guild_id = None if scope == GLOBAL else int(scope)
+        for key, command_id in removed.items():
+            if command_id is None:
+                log.warning("Cannot delete %s in %s, as its id is unknown", key, scope)
+            else:
+                await http.delete_application_command(
+                    application_id=application_id, command_id=int(command_id), guild_id=guild_id
+                )
+                log.debug("Deleted %s in %s", key, scope)
+            state.forget(scope, key)
+
+    state.save()
+    log.info("Synced commands: %r", plan)
+    return plan
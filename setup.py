@@ -24,4 +24,7 @@ setup(
         "discord-py-interactions>=4.3.0",
         "typing_extensions",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
 )